@@ -0,0 +1,72 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from database import DatabaseManager
+
+def generate_messages(count: int) -> List[Tuple[int, Optional[str], Optional[int], Optional[datetime]]]:
+    """Snowflake-like increasing IDs with one status update a minute"""
+    start = datetime(2023, 6, 1)
+    statuses = ["Open", "Closed", "Opening", "Closing"]
+    return [
+        (1123644900378935399 + i * 4194304, statuses[i % len(statuses)], 80 + i % 20, start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+def legacy_backfill(db_path: str, messages: list) -> None:
+    """The previous writer: rollback journal, one INSERT and commit per message"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE,
+            gate_status TEXT,
+            gate_status_confidence INTEGER,
+            garage_occupancy TEXT,
+            timestamp TEXT
+        )
+    ''')
+    for message_id, gate_status, confidence, timestamp in messages:
+        try:
+            cursor.execute('''
+                INSERT INTO messages (message_id, gate_status, gate_status_confidence, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', (str(message_id), gate_status, confidence, str(timestamp)))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            pass
+    conn.close()
+
+def batched_backfill(db_path: str, messages: list, batch_size: int) -> None:
+    db_manager = DatabaseManager(db_path, batch_size=batch_size)
+    for message in messages:
+        db_manager.save_message(*message)
+    db_manager.close()
+
+def main(count: int, legacy_count: int, batch_size: int) -> None:
+    messages = generate_messages(count)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Per-row commits are slow enough that a smaller sample is representative
+        for name, run, rows in [
+            ("per-row commit", lambda path: legacy_backfill(path, messages[:legacy_count]), legacy_count),
+            (f"batched x{batch_size} (WAL)", lambda path: batched_backfill(path, messages, batch_size), count),
+        ]:
+            db_path = os.path.join(directory, f"{len(os.listdir(directory))}.db")
+            start = time.perf_counter()
+            run(db_path)
+            elapsed = time.perf_counter() - start
+            print(f" * {name}: {rows} rows in {elapsed:.2f}s | {rows / elapsed:.0f} rows/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill generated messages into a temporary database and report rows/second")
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--legacy-messages", type=int, default=5000, help="Messages written with per-row commits")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    main(args.messages, min(args.legacy_messages, args.messages), args.batch_size)
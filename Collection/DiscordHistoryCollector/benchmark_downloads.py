@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import os
+import queue
+import threading
+import time
+import tracemalloc
+from typing import List, Tuple
+import aiohttp
+from aiohttp import web
+from config import UPLOAD_PART_SIZE
+from download_worker import DownloadWorker, attachment_filename
+
+class FakeMinioManager:
+    """MinIO stand-in: every upload takes `latency` seconds"""
+
+    def __init__(self, latency: float) -> None:
+        self.latency: float = latency
+        self.uploaded: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def upload_file(self, file_data: bytes, filename: str, content_type=None) -> bool:
+        time.sleep(self.latency)
+        with self.lock:
+            self.uploaded += 1
+        return True
+
+    def upload_stream(self, stream, length, filename: str, content_type=None) -> bool:
+        # Consume the stream part by part like put_object does
+        remaining = length if length is not None else -1
+        while remaining != 0:
+            data = stream.read(min(remaining, UPLOAD_PART_SIZE) if remaining > 0 else UPLOAD_PART_SIZE)
+            if not data:
+                break
+            if remaining > 0:
+                remaining -= len(data)
+        return self.upload_file(b"", filename, content_type)
+
+def start_http_server(image_size: int, latency: float) -> Tuple[str, threading.Event]:
+    """Serve `image_size` byte attachments after `latency` seconds, returns (base URL, stop event)"""
+    payload = os.urandom(image_size)
+    started = threading.Event()
+    stop = threading.Event()
+    address: List[str] = []
+
+    async def attachment(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.Response(body=payload, content_type="image/jpeg")
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/attachments/{name}", attachment)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        address.append(f"http://127.0.0.1:{port}")
+        started.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        await runner.cleanup()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    started.wait()
+    return address[0], stop
+
+def legacy_download(tasks: List[Tuple[int, str]], minio_manager, workers: int) -> None:
+    """The previous design: one thread per worker, each with its own loop and session, one download at a time"""
+    download_queue: queue.Queue = queue.Queue()
+    for task in tasks:
+        download_queue.put(task)
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        session = loop.run_until_complete(_create_session())
+        while True:
+            try:
+                message_id, url = download_queue.get_nowait()
+            except queue.Empty:
+                break
+            loop.run_until_complete(_download(session, minio_manager, message_id, url))
+        loop.run_until_complete(session.close())
+        loop.close()
+
+    threads = [threading.Thread(target=run) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+async def _create_session() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession()
+
+async def _download(session: aiohttp.ClientSession, minio_manager, message_id: int, url: str) -> None:
+    async with session.get(url) as response:
+        if response.status == 200:
+            file_data = await response.read()
+            minio_manager.upload_file(file_data, attachment_filename(message_id, url))
+
+def engine_download(tasks: List[Tuple[int, str]], minio_manager, concurrency: int) -> None:
+    """The async download engine"""
+    worker = DownloadWorker(minio_manager, concurrency=concurrency)
+    thread = worker.start()
+    for message_id, url in tasks:
+        worker.submit(message_id, url)
+    worker.wait_idle()
+    worker.stop()
+    thread.join()
+
+def main(images: int, image_size: int, latency: float, upload_latency: float, workers: int, concurrency: int,
+         use_minio: bool) -> None:
+    base_url, stop = start_http_server(image_size, latency)
+    tasks = [(message_id, f"{base_url}/attachments/{message_id}.jpg") for message_id in range(images)]
+
+    if use_minio:
+        from minio_client import MinioManager
+        minio_manager = MinioManager()
+    else:
+        minio_manager = FakeMinioManager(upload_latency)
+
+    print(f"{images} images of {image_size / 1024:.0f}KB, {latency * 1000:.0f}ms download latency, "
+          f"{'MinIO' if use_minio else f'{upload_latency * 1000:.0f}ms upload latency'}")
+
+    # Same concurrency first, then what a single loop can afford without extra threads
+    for name, run in [(f"thread per worker x{workers}", lambda: legacy_download(tasks, minio_manager, workers)),
+                      (f"async engine x{workers}", lambda: engine_download(tasks, minio_manager, workers)),
+                      (f"async engine x{concurrency}", lambda: engine_download(tasks, minio_manager, concurrency))]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f" * {name}: {elapsed:.2f}s | {images / elapsed:.1f} images/s | peak {peak / 1e6:.1f}MB")
+
+    stop.set()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the download engines against a local HTTP server and a MinIO stand-in")
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--image-size", type=int, default=200 * 1024, help="Bytes per attachment")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the HTTP server waits before answering")
+    parser.add_argument("--upload-latency", type=float, default=0.02, help="Seconds per upload of the MinIO stand-in")
+    parser.add_argument("--workers", type=int, default=10, help="Threads for the previous design")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrency for the second async engine run")
+    parser.add_argument("--minio", action="store_true", help="Upload to the MinIO configured in .env instead")
+    args = parser.parse_args()
+
+    main(args.images, args.image_size, args.latency, args.upload_latency, args.workers, args.concurrency, args.minio)
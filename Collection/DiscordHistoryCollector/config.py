@@ -10,7 +10,20 @@ DISCORD_TOKEN: Optional[str] = os.getenv('DISCORD_TOKEN')
 DISCORD_CHANNEL_ID: int = int(os.getenv('DISCORD_CHANNEL_ID', '0'))
 
 # Download Configuration
-NUM_DOWNLOAD_THREADS: int = int(os.getenv('NUM_DOWNLOAD_THREADS', '10'))
+# NUM_DOWNLOAD_THREADS is still honoured as the concurrency for older .env files
+DOWNLOAD_CONCURRENCY: int = int(os.getenv('DOWNLOAD_CONCURRENCY', os.getenv('NUM_DOWNLOAD_THREADS', '10')))
+UPLOAD_THREADS: int = int(os.getenv('UPLOAD_THREADS', str(DOWNLOAD_CONCURRENCY)))  # each one streams a single transfer
+DOWNLOAD_RETRIES: int = int(os.getenv('DOWNLOAD_RETRIES', '3'))
+DOWNLOAD_BACKOFF: float = float(os.getenv('DOWNLOAD_BACKOFF', '1'))  # seconds, doubled on every retry
+DOWNLOAD_TIMEOUT: float = float(os.getenv('DOWNLOAD_TIMEOUT', '60'))  # seconds without progress (connect or read) before an attempt fails
+
+# Database Configuration
+DB_BATCH_SIZE: int = int(os.getenv('DB_BATCH_SIZE', '500'))  # messages per transaction
+
+# Ingest Configuration
+INGEST_FETCHERS: int = int(os.getenv('INGEST_FETCHERS', '4'))  # message ID windows fetched in parallel
+INGEST_QUEUE_SIZE: int = int(os.getenv('INGEST_QUEUE_SIZE', '1000'))  # messages buffered between stages
+INGEST_FLUSH_INTERVAL: float = float(os.getenv('INGEST_FLUSH_INTERVAL', '5'))  # seconds before a partial batch is written
 
 # MinIO Configuration
 MINIO_ENDPOINT: str = os.getenv('MINIO_ENDPOINT', 'localhost:9000')
@@ -18,6 +31,7 @@ MINIO_ACCESS_KEY: str = os.getenv('MINIO_ACCESS_KEY', 'admin')
 MINIO_SECRET_KEY: str = os.getenv('MINIO_SECRET_KEY', 'minio_admin')
 MINIO_BUCKET: str = os.getenv('MINIO_BUCKET', 'garage')
 MINIO_SECURE: bool = os.getenv('MINIO_SECURE', 'false').lower() == 'true'
+UPLOAD_PART_SIZE: int = int(os.getenv('UPLOAD_PART_SIZE', str(5 * 1024 * 1024)))  # bytes, multipart part size when the length is unknown
 
 # Label Studio Configuration (optional)
 LABEL_STUDIO_ENABLED: bool = os.getenv('LABEL_STUDIO_ENABLED', 'false').lower() == 'true'
@@ -1,67 +1,112 @@
 import sqlite3
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
+from config import DB_BATCH_SIZE
+from migrations import migrate
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "messages.db") -> None:
+    def __init__(self, db_path: str = "messages.db", batch_size: int = DB_BATCH_SIZE,
+                 check_same_thread: bool = True) -> None:
         self.db_path: str = db_path
+        self.batch_size: int = batch_size
+        self.check_same_thread: bool = check_same_thread
         self.conn: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
+        self.pending: List[Tuple[int, Optional[str], Optional[int], Optional[str]]] = []
+        self.inserted: int = 0
         self._init_database()
-    
+
     def _init_database(self) -> None:
         """Initialize database connection and create tables"""
-        self.conn = sqlite3.connect(self.db_path)
+        # check_same_thread=False lets one writer thread other than the creating one use the connection
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=self.check_same_thread)
         self.cursor = self.conn.cursor()
-        
-        # Create table if it doesn't exist
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id TEXT UNIQUE,
-                gate_status TEXT,
-                gate_status_confidence INTEGER,
-                garage_occupancy TEXT,
-                timestamp TEXT
-            )
-        ''')
-        self.conn.commit()
-    
+
+        # WAL + synchronous=NORMAL: commits append to the log without an fsync each,
+        # the database stays consistent and only the last transactions can be lost on power failure
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+
+        # Create or upgrade the schema in place
+        migrate(self.conn)
+
     def get_last_message_id(self) -> Optional[int]:
-        """Get the last saved message ID"""
+        """Get the resume cursor (the newest message ID that has been written)"""
         if self.cursor is None:
             return None
-        self.cursor.execute("SELECT message_id FROM messages ORDER BY message_id DESC LIMIT 1")
+        self.cursor.execute("SELECT message_id FROM checkpoints WHERE name = 'history'")
         row = self.cursor.fetchone()
         return int(row[0]) if row else None
-    
-    def save_message(self, message_id: int, gate_status: Optional[str] = None, 
+
+    def save_message(self, message_id: int, gate_status: Optional[str] = None,
                     confidence: Optional[int] = None, timestamp: Optional[datetime] = None) -> bool:
-        """Save a message to the database"""
+        """Queue a message for the next batch, the batch is written once it reaches batch_size"""
         if self.cursor is None:
             return False
-        try:
+        self.pending.append((
+            int(message_id),
+            gate_status,
+            confidence,
+            str(timestamp) if timestamp else None
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def save_messages(self, rows: List[Tuple[int, Optional[str], Optional[int], Optional[datetime]]],
+                      checkpoint: Optional[int] = None) -> int:
+        """Write (message_id, gate_status, confidence, timestamp) rows in one transaction, returns the number inserted
+
+        The resume cursor moves to `checkpoint` (default: the newest message
+        written), callers writing out of order pass the highest ID below which
+        every message has been handled.
+        """
+        self.pending.extend(
+            (int(message_id), gate_status, confidence, str(timestamp) if timestamp else None)
+            for message_id, gate_status, confidence, timestamp in rows
+        )
+        return self.flush(checkpoint)
+
+    def flush(self, checkpoint: Optional[int] = None) -> int:
+        """Write the queued messages in a single transaction, returns the number of new rows"""
+        if self.conn is None or self.cursor is None or (not self.pending and checkpoint is None):
+            return 0
+
+        batch, self.pending = self.pending, []
+        if checkpoint is None:
+            checkpoint = max(row[0] for row in batch)
+
+        inserted = 0
+        with self.conn:
+            # Messages that are already stored are skipped by the unique message_id index
+            if batch:
+                self.cursor.executemany('''
+                    INSERT OR IGNORE INTO messages (message_id, gate_status, gate_status_confidence, timestamp)
+                    VALUES (?, ?, ?, ?)
+                ''', batch)
+                inserted = self.cursor.rowcount
+
+            # The cursor moves in the same transaction as the rows, it never points past unwritten messages
             self.cursor.execute('''
-                INSERT INTO messages (message_id, gate_status, gate_status_confidence, timestamp)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                str(message_id),
-                gate_status,
-                confidence,
-                str(timestamp) if timestamp else None
-            ))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            print(f"[{datetime.now()}] WARNING: Message {message_id} already exists in database")
-            return False
-    
+                INSERT INTO checkpoints (name, message_id, updated_at) VALUES ('history', ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    message_id = MAX(message_id, excluded.message_id),
+                    updated_at = excluded.updated_at
+            ''', (checkpoint, str(datetime.now())))
+
+        if inserted < len(batch):
+            print(f"[{datetime.now()}] WARNING: {len(batch) - inserted} of {len(batch)} messages already exist in database")
+        self.inserted += inserted
+        return inserted
+
     def commit(self) -> None:
-        """Commit pending changes"""
+        """Write pending messages and commit"""
+        self.flush()
         if self.conn:
             self.conn.commit()
-    
+
     def close(self) -> None:
         """Close database connection"""
         if self.conn:
-            self.conn.close() 
\ No newline at end of file
+            self.commit()
+            self.conn.close()
@@ -1,139 +1,276 @@
 import asyncio
 import aiohttp
+import email.utils
 import os
+import random
 import urllib.parse
-import queue
 import threading
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 from minio_client import MinioManager
-from config import NUM_DOWNLOAD_THREADS
+from config import DOWNLOAD_CONCURRENCY, UPLOAD_THREADS, DOWNLOAD_RETRIES, DOWNLOAD_BACKOFF, DOWNLOAD_TIMEOUT
+
+class RetryableDownloadError(Exception):
+    """HTTP status worth retrying (rate limited or a server error)"""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status: int = status
+        self.retry_after: Optional[float] = retry_after
+
+class StageMetrics:
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.bytes: int = 0
+        self.busy_seconds: float = 0.0
+
+    def record(self, size: int, seconds: float) -> None:
+        self.count += 1
+        self.bytes += size
+        self.busy_seconds += seconds
+
+    def report(self, elapsed: float) -> str:
+        return (f"{self.count} files ({self.count / elapsed:.1f}/s, {self.bytes / elapsed / 1e6:.2f}MB/s), "
+                f"avg {self.busy_seconds / self.count * 1000 if self.count else 0:.0f}ms")
+
+class DownloadMetrics:
+    """Per-stage throughput plus retry/failure counters"""
+
+    def __init__(self) -> None:
+        self.started_at: float = time.monotonic()
+        self.download: StageMetrics = StageMetrics()
+        self.upload: StageMetrics = StageMetrics()
+        self.retries: int = 0
+        self.failed: int = 0
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        return (f"download: {self.download.report(elapsed)} | upload: {self.upload.report(elapsed)} | "
+                f"retries {self.retries} | failed {self.failed}")
+
+class ResponseReader:
+    """Blocking file-like view of an aiohttp response body for the upload threads
+
+    Each read() is run on the event loop and returns the next `size` bytes
+    straight from the response buffer, so the body is never collected into
+    one bytes object. Only MinIO's single in-flight part is held in memory.
+    """
+
+    def __init__(self, content: aiohttp.StreamReader, loop: asyncio.AbstractEventLoop) -> None:
+        self.content: aiohttp.StreamReader = content
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.bytes_read: int = 0
+        self.wait_seconds: float = 0.0
+        self.error: Optional[BaseException] = None
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.monotonic()
+        try:
+            data = asyncio.run_coroutine_threadsafe(self._read(size), self.loop).result()
+        except Exception as e:
+            # Remembered so a broken download is retried instead of reported as an upload failure
+            self.error = e
+            raise
+        self.wait_seconds += time.monotonic() - start
+        self.bytes_read += len(data)
+        return data
+
+    async def _read(self, size: int) -> bytes:
+        if size < 0:
+            return await self.content.read()
+        try:
+            return await self.content.readexactly(size)
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay in seconds or an HTTP date), None when missing or invalid"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((email.utils.parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def attachment_filename(message_id: int, url: str) -> str:
+    """Object name for an attachment: the message ID with the original extension (.jpg when missing)"""
+    _, ext = os.path.splitext(os.path.basename(urllib.parse.urlparse(url).path))
+    return f"{message_id}{ext or '.jpg'}"
 
 class DownloadWorker:
-    def __init__(self, worker_id: int, download_queue: queue.Queue, minio_manager: MinioManager) -> None:
-        self.worker_id: int = worker_id
-        self.download_queue: queue.Queue = download_queue
+    """Async download engine running on a single event loop
+
+    All downloads share one connection-pooled aiohttp session. At most
+    `concurrency` attachments are in flight at a time. Each response body is
+    streamed into MinIO by a small upload thread pool (the blocking client
+    never runs on the loop), so memory stays flat whatever the file sizes.
+    """
+
+    def __init__(self, minio_manager: MinioManager, concurrency: int = DOWNLOAD_CONCURRENCY,
+                 upload_threads: int = UPLOAD_THREADS, retries: int = DOWNLOAD_RETRIES,
+                 backoff: float = DOWNLOAD_BACKOFF, timeout: float = DOWNLOAD_TIMEOUT) -> None:
         self.minio_manager: MinioManager = minio_manager
+        self.concurrency: int = concurrency
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.timeout: float = timeout
+        self.upload_pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=upload_threads, thread_name_prefix="minio-upload")
+        self.metrics: DownloadMetrics = DownloadMetrics()
+
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.queue: Optional[asyncio.Queue] = None
         self.session: Optional[aiohttp.ClientSession] = None
-        self.loop: Optional[asyncio.AbstractEventLoop] = None
-    
+        self.ready: threading.Event = threading.Event()
+
+        # Submitted but not yet finished, guarded by the condition so other threads can wait on it
+        self.pending: int = 0
+        self.idle: threading.Condition = threading.Condition()
+
     def start(self) -> threading.Thread:
-        """Start the download worker thread"""
+        """Start the event loop thread"""
         thread = threading.Thread(target=self._run, daemon=True)
         thread.start()
+        self.ready.wait()
         return thread
-    
+
+    def submit(self, message_id: int, url: str) -> None:
+        """Queue an attachment for download, safe to call from any thread"""
+        with self.idle:
+            self.pending += 1
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (message_id, url))
+
+    def stop(self) -> None:
+        """Finish the in-flight downloads and stop the loop"""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+    def wait_idle(self) -> None:
+        """Block until every submitted attachment has been processed"""
+        with self.idle:
+            self.idle.wait_for(lambda: self.pending == 0)
+
     def _run(self) -> None:
-        """Main worker loop"""
+        asyncio.set_event_loop(self.loop)
         try:
-            # Create asyncio loop for this thread
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            
-            # Create aiohttp session
-            self.session = self.loop.run_until_complete(self._create_session())
-            
-            print(f"[{datetime.now()}] Download worker {self.worker_id} started")
-            
-            while True:
-                try:
-                    # Get download task from queue
-                    task: Optional[Tuple[int, str]] = self.download_queue.get(timeout=10)
-                    if task is None:  # Shutdown signal
-                        break
-                    
-                    message_id, url = task
-                    
-                    # Download the file
-                    if self.loop:
-                        self.loop.run_until_complete(self._download_single_file(url, message_id))
-                    
-                    self.download_queue.task_done()
-                    
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    print(f"[{datetime.now()}] ERROR: Worker {self.worker_id} error: {e}")
-                    self.download_queue.task_done()
-                    
+            self.loop.run_until_complete(self._serve())
         except Exception as e:
-            print(f"[{datetime.now()}] FATAL ERROR: Worker {self.worker_id} fatal error: {e}")
+            print(f"[{datetime.now()}] FATAL ERROR: Download engine error: {e}")
         finally:
-            if self.session and self.loop:
-                self.loop.run_until_complete(self.session.close())
-            if self.loop:
-                self.loop.close()
-            print(f"[{datetime.now()}] Download worker {self.worker_id} stopped")
-    
-    async def _create_session(self) -> aiohttp.ClientSession:
-        """Create aiohttp session"""
-        return aiohttp.ClientSession()
-    
-    async def _download_single_file(self, url: str, message_id: int) -> None:
-        """Download a single file and upload to MinIO"""
+            self.upload_pool.shutdown(wait=True)
+            self.loop.close()
+            print(f"[{datetime.now()}] Download engine stopped - {self.metrics.report()}")
+
+    async def _serve(self) -> None:
+        """Dispatch queued attachments, at most `concurrency` at a time"""
+        self.queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        in_flight: set = set()
+
+        # No total timeout, the response stays open while its body is streamed into MinIO. Only a stalled
+        # connect or read fails, however long the upload of a large attachment takes
+        timeout = aiohttp.ClientTimeout(total=None, connect=self.timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as self.session:
+            self.ready.set()
+            print(f"[{datetime.now()}] Download engine started ({self.concurrency} concurrent downloads)")
+
+            while True:
+                task: Optional[Tuple[int, str]] = await self.queue.get()
+                if task is None:  # Shutdown signal
+                    break
+
+                await semaphore.acquire()
+                future = asyncio.ensure_future(self._process(*task))
+                in_flight.add(future)
+                future.add_done_callback(in_flight.discard)
+                future.add_done_callback(lambda _: semaphore.release())
+
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _process(self, message_id: int, url: str) -> None:
+        """Stream one attachment into MinIO, retrying rate limits, server errors and broken transfers"""
+        filename = attachment_filename(message_id, url)
         try:
-            # Extract file extension from URL
-            parsed_url = urllib.parse.urlparse(url)
-            path = parsed_url.path
-            original_filename = os.path.basename(path)
-            
-            # Get file extension from original filename
-            _, ext = os.path.splitext(original_filename)
-            
-            # Always use message_id as filename, preserve original extension
-            if ext:
-                filename = f"{message_id}{ext}"
-            else:
-                # Default to .jpg if no extension found
-                filename = f"{message_id}.jpg"
-            
-            # Download the file directly to memory
-            if self.session:
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        # Read the entire file into memory
-                        file_data: bytes = await response.read()
-                        
-                        # Upload to MinIO
-                        if self.minio_manager.upload_file(file_data, filename):
-                            print(f"[{datetime.now()}] Worker {self.worker_id}: Downloaded and uploaded to MinIO: {filename}")
-                        else:
-                            print(f"[{datetime.now()}] ERROR: Worker {self.worker_id}: Failed to upload {filename} to MinIO")
-                    else:
-                        print(f"[{datetime.now()}] ERROR: Worker {self.worker_id}: Failed to download {url}: HTTP {response.status}")
+            for attempt in range(self.retries + 1):
+                try:
+                    if not await self._transfer(url, filename):
+                        self.metrics.failed += 1
+                    return
+                except (RetryableDownloadError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.retries:
+                        print(f"[{datetime.now()}] ERROR: Giving up on {url} after {attempt + 1} attempts: {e}")
+                        self.metrics.failed += 1
+                        return
+
+                    # Honour Retry-After when the CDN sends one, otherwise back off exponentially with jitter
+                    delay = getattr(e, "retry_after", None) or self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    self.metrics.retries += 1
+                    print(f"[{datetime.now()}] WARNING: Download of {url} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
         except Exception as e:
-            print(f"[{datetime.now()}] ERROR: Worker {self.worker_id}: Error downloading {url}: {e}")
+            self.metrics.failed += 1
+            print(f"[{datetime.now()}] ERROR: Error processing {url}: {e}")
+        finally:
+            with self.idle:
+                self.pending -= 1
+                self.idle.notify_all()
+
+    async def _transfer(self, url: str, filename: str) -> bool:
+        """Pipe the response body into MinIO, False when the file cannot be downloaded or uploaded"""
+        start = time.monotonic()
+        async with self.session.get(url) as response:
+            if response.status == 429 or response.status >= 500:
+                raise RetryableDownloadError(response.status, parse_retry_after(response.headers.get("Retry-After")))
+            if response.status != 200:
+                print(f"[{datetime.now()}] ERROR: Failed to download {url}: HTTP {response.status}")
+                return False
+
+            # The upload thread pulls the body through the reader while the response stays open here
+            reader = ResponseReader(response.content, self.loop)
+            uploaded = await self.loop.run_in_executor(
+                self.upload_pool, self.minio_manager.upload_stream,
+                reader, response.content_length, filename
+            )
+            if reader.error is not None:
+                raise reader.error
+
+        # Download time is spent waiting on the CDN inside read(), the rest of the transfer is the upload
+        elapsed = time.monotonic() - start
+        self.metrics.download.record(reader.bytes_read, reader.wait_seconds)
+        if not uploaded:
+            print(f"[{datetime.now()}] ERROR: Failed to upload {filename} to MinIO")
+            return False
+        self.metrics.upload.record(reader.bytes_read, elapsed - reader.wait_seconds)
+        return True
 
 class DownloadManager:
-    def __init__(self) -> None:
-        self.num_workers: int = NUM_DOWNLOAD_THREADS
-        self.download_queue: queue.Queue = queue.Queue()
-        self.minio_manager: MinioManager = MinioManager()
-        self.workers: list[threading.Thread] = []
-    
+    def __init__(self, minio_manager: Optional[MinioManager] = None) -> None:
+        self.minio_manager: MinioManager = minio_manager or MinioManager()
+        self.worker: DownloadWorker = DownloadWorker(self.minio_manager)
+        self.thread: Optional[threading.Thread] = None
+
     def start_workers(self) -> None:
-        """Start all download worker threads"""
-        for i in range(self.num_workers):
-            worker = DownloadWorker(i + 1, self.download_queue, self.minio_manager)
-            thread = worker.start()
-            self.workers.append(thread)
-        
-        print(f"[{datetime.now()}] Started {self.num_workers} download worker threads")
-    
+        """Start the download engine"""
+        self.thread = self.worker.start()
+
     def add_download_task(self, message_id: int, url: str) -> None:
         """Add a download task to the queue"""
-        self.download_queue.put((message_id, url))
-    
+        self.worker.submit(message_id, url)
+
     def wait_for_completion(self) -> None:
         """Wait for all downloads to complete"""
         print(f"[{datetime.now()}] Waiting for remaining downloads to complete...")
-        self.download_queue.join()
-    
+        self.worker.wait_idle()
+        print(f"[{datetime.now()}] INFO: Downloads - {self.worker.metrics.report()}")
+
     def shutdown_workers(self) -> None:
-        """Signal worker threads to shutdown"""
-        for _ in range(self.num_workers):
-            self.download_queue.put(None)
-        
-        # Wait for all threads to finish
-        for thread in self.workers:
-            thread.join(timeout=5) 
\ No newline at end of file
+        """Signal the download engine to shutdown"""
+        self.worker.stop()
+        if self.thread:
+            self.thread.join(timeout=5)
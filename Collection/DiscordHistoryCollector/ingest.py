@@ -0,0 +1,212 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, List, NamedTuple, Optional, Tuple
+import discord
+from discord import Object
+from config import INGEST_FETCHERS, INGEST_QUEUE_SIZE, INGEST_FLUSH_INTERVAL, DB_BATCH_SIZE
+from database import DatabaseManager
+from download_worker import DownloadManager
+
+class ParsedMessage(NamedTuple):
+    window: int
+    message_id: int
+    gate_status: Optional[str]
+    confidence: int
+    created_at: datetime
+    attachment_url: Optional[str]
+
+class WindowDone(NamedTuple):
+    """Sent after the last message of a window, it travels through the same queues as the messages"""
+    window: int
+
+def parse_message(window: int, message: discord.Message) -> ParsedMessage:
+    """Pull the gate status, confidence and image URL out of a status message's embeds"""
+    gate_status: Optional[str] = None
+    confidence: int = 0
+
+    # Find the embed fields
+    for embed in message.embeds:
+        for f in embed.fields:
+            if f.name and f.value:
+                fname: str = f.name.lower().strip()
+                fvalue: str = f.value.strip()
+
+                if fname == "status":
+                    gate_status = fvalue
+                elif fname == "confidence":
+                    try:
+                        confidence = int(fvalue.strip('%'))
+                    except ValueError:
+                        confidence = 0
+
+    # Always store first attachment URL from embeds
+    attachment_url: Optional[str] = None
+    for embed in message.embeds:
+        if embed.thumbnail and embed.thumbnail.url:
+            attachment_url = embed.thumbnail.url
+            break
+
+    return ParsedMessage(window, message.id, gate_status, confidence, message.created_at, attachment_url)
+
+def split_windows(after_id: int, before_id: int, count: int) -> List[Tuple[int, int]]:
+    """Split the message ID range (after_id, before_id] into `count` disjoint windows of equal time"""
+    count = max(1, min(count, before_id - after_id))
+    step = (before_id - after_id) // count
+    bounds = [after_id + i * step for i in range(count)] + [before_id]
+    return [(bounds[i], bounds[i + 1]) for i in range(count)]
+
+class IngestPipeline:
+    """History fetch -> parse -> batched persistence, joined by bounded asyncio queues
+
+    Disjoint message ID windows are paged in parallel (one fetcher each), a
+    single parse stage extracts the embeds and queues the downloads, and the
+    persistence stage writes batches on its own thread so SQLite never blocks
+    the Discord event loop. The resume cursor only moves up to the point below
+    which every window has been persisted, so an interrupted backfill never
+    skips messages.
+    """
+
+    def __init__(self, channel: Any, db_manager: DatabaseManager, download_manager: DownloadManager,
+                 fetchers: int = INGEST_FETCHERS, queue_size: int = INGEST_QUEUE_SIZE,
+                 batch_size: int = DB_BATCH_SIZE, flush_interval: float = INGEST_FLUSH_INTERVAL) -> None:
+        self.channel = channel
+        self.db_manager: DatabaseManager = db_manager
+        self.download_manager: DownloadManager = download_manager
+        self.fetchers: int = fetchers
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+
+        self.fetched_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.parsed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.db_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+        self.windows: List[Tuple[int, int]] = []
+        self.progress: List[int] = []
+        self.done: List[bool] = []
+        self.checkpoint: int = 0
+
+        self.fetched: int = 0
+        self.parsed: int = 0
+        self.stored: int = 0
+        self.skipped: int = 0
+        self.downloads: int = 0
+        self.started_at: float = 0.0
+
+    async def run(self, after_id: Optional[int]) -> int:
+        """Ingest every message after `after_id` (the channel's start when None), returns the number processed"""
+        self.started_at = time.monotonic()
+
+        lower = after_id if after_id else discord.utils.time_snowflake(self.channel.created_at) - 1
+        upper = discord.utils.time_snowflake(datetime.now(timezone.utc))
+        self.windows = split_windows(lower, upper, self.fetchers)
+        self.progress = [window_after for window_after, _ in self.windows]
+        self.done = [False] * len(self.windows)
+        self.checkpoint = lower
+        print(f"[{datetime.now()}] INFO: Fetching history in {len(self.windows)} parallel windows")
+
+        fetchers = [asyncio.create_task(self._fetch(i)) for i in range(len(self.windows))]
+        parser = asyncio.create_task(self._parse())
+        persister = asyncio.create_task(self._persist())
+
+        stages = [*fetchers, parser, persister, asyncio.create_task(self._close_stages(fetchers, parser))]
+
+        try:
+            # Awaited together so a failing stage fails the run instead of leaving the others blocked on full queues
+            await asyncio.gather(*stages)
+        finally:
+            for task in stages:
+                task.cancel()
+            self.db_executor.shutdown(wait=True)
+
+        print(f"[{datetime.now()}] INFO: Ingest finished - {self.report()}")
+        return self.fetched
+
+    async def _close_stages(self, fetchers: List[asyncio.Task], parser: asyncio.Task) -> None:
+        """Signal the end of the input to each stage once the one before it is done"""
+        await asyncio.gather(*fetchers)
+        await self.fetched_queue.put(None)
+        await parser
+        await self.parsed_queue.put(None)
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        return (f"{self.fetched} messages in {elapsed:.1f}s ({self.fetched / elapsed:.1f} msg/s) | "
+                f"stored {self.stored} | skipped {self.skipped} | downloads queued {self.downloads}")
+
+    async def _fetch(self, window: int) -> None:
+        """Page one window oldest first, `after`/`before` are both exclusive"""
+        window_after, window_before = self.windows[window]
+        async for message in self.channel.history(after=Object(id=window_after), before=Object(id=window_before + 1),
+                                                  oldest_first=True, limit=None):
+            self.fetched += 1
+            await self.fetched_queue.put((window, message))
+        await self.fetched_queue.put(WindowDone(window))
+
+    async def _parse(self) -> None:
+        while True:
+            item = await self.fetched_queue.get()
+            if item is None:
+                break
+            if isinstance(item, WindowDone):
+                await self.parsed_queue.put(item)
+                continue
+
+            window, message = item
+            parsed = parse_message(window, message)
+
+            # Status updates sent with DISCORD_ATTACHMENT_PROFILE=none only carry the embed
+            if parsed.attachment_url:
+                self.download_manager.add_download_task(parsed.message_id, parsed.attachment_url)
+                self.downloads += 1
+            elif not parsed.gate_status:
+                self.skipped += 1  # Neither a status nor an image, it still advances the window
+
+            await self.parsed_queue.put(parsed)
+
+            self.parsed += 1
+            if self.parsed % 1000 == 0:
+                print(f"[{datetime.now()}] INFO: {self.report()}")
+
+    async def _persist(self) -> None:
+        """Write batches of `batch_size` messages (or whatever arrived within `flush_interval`)"""
+        loop = asyncio.get_running_loop()
+        rows: list = []
+        finished = False
+
+        while not finished:
+            deadline = loop.time() + self.flush_interval
+            while len(rows) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self.parsed_queue.get(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                if isinstance(item, WindowDone):
+                    self.done[item.window] = True
+                    continue
+
+                self.progress[item.window] = item.message_id
+                if item.attachment_url or item.gate_status:
+                    rows.append((item.message_id, item.gate_status, item.confidence, item.created_at))
+
+            checkpoint = self._safe_checkpoint()
+            if not rows and checkpoint <= self.checkpoint:
+                continue
+
+            batch, rows = rows, []
+            await loop.run_in_executor(self.db_executor, self.db_manager.save_messages, batch, checkpoint)
+            self.stored += len(batch)
+            self.checkpoint = checkpoint
+
+    def _safe_checkpoint(self) -> int:
+        """Highest message ID below which every window has been persisted"""
+        checkpoint = self.checkpoint
+        for window, (_, window_before) in enumerate(self.windows):
+            if not self.done[window]:
+                return max(checkpoint, self.progress[window])
+            checkpoint = window_before
+        return checkpoint
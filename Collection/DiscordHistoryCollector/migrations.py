@@ -0,0 +1,86 @@
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+def _initial_schema(conn: sqlite3.Connection) -> None:
+    """The original schema, a no-op for databases created before migrations existed"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE,
+            gate_status TEXT,
+            gate_status_confidence INTEGER,
+            garage_occupancy TEXT,
+            timestamp TEXT
+        )
+    ''')
+
+def _integer_message_ids(conn: sqlite3.Connection) -> None:
+    """Store message IDs as INTEGER (TEXT sorts snowflakes lexicographically) and add query indexes"""
+    conn.execute('''
+        CREATE TABLE messages_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL,
+            gate_status TEXT,
+            gate_status_confidence INTEGER,
+            garage_occupancy TEXT,
+            timestamp TEXT
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO messages_new (id, message_id, gate_status, gate_status_confidence, garage_occupancy, timestamp)
+        SELECT id, CAST(message_id AS INTEGER), gate_status, gate_status_confidence, garage_occupancy, timestamp
+        FROM messages
+        WHERE message_id IS NOT NULL
+    ''')
+    conn.execute("DROP TABLE messages")
+    conn.execute("ALTER TABLE messages_new RENAME TO messages")
+
+    # Unique lookups and the resume cursor (MAX(message_id)) are answered from this index alone
+    conn.execute("CREATE UNIQUE INDEX idx_messages_message_id ON messages (message_id)")
+    conn.execute("CREATE INDEX idx_messages_timestamp ON messages (timestamp)")
+    conn.execute("CREATE INDEX idx_messages_gate_status ON messages (gate_status, timestamp)")
+
+def _checkpoints(conn: sqlite3.Connection) -> None:
+    """Resume cursor kept apart from the messages themselves"""
+    conn.execute('''
+        CREATE TABLE checkpoints (
+            name TEXT PRIMARY KEY,
+            message_id INTEGER NOT NULL,
+            updated_at TEXT
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO checkpoints (name, message_id, updated_at)
+        SELECT 'history', MAX(message_id), ? FROM messages HAVING MAX(message_id) IS NOT NULL
+    ''', (str(datetime.now()),))
+
+# (version, description, migration) - append only, a released migration is never edited
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "initial schema", _initial_schema),
+    (2, "integer message ids and indexes", _integer_message_ids),
+    (3, "checkpoints table", _checkpoints),
+]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Current schema version, stored in PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply the pending migrations in place, each in its own transaction, returns the schema version"""
+    version = schema_version(conn)
+    for target, description, migration in MIGRATIONS:
+        if target <= version:
+            continue
+
+        print(f"[{datetime.now()}] INFO: Migrating messages database to version {target} ({description})")
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+    return version
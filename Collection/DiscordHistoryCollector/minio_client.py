@@ -1,10 +1,10 @@
 import os
 import io
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Optional
 from minio import Minio
 from minio.error import S3Error
-from config import MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET, MINIO_SECURE
+from config import MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET, MINIO_SECURE, UPLOAD_PART_SIZE
 
 class MinioManager:
     def __init__(self) -> None:
@@ -29,11 +29,19 @@ class MinioManager:
     
     def upload_file(self, file_data: bytes, filename: str, content_type: Optional[str] = None) -> bool:
         """Upload file data to MinIO"""
+        # BytesIO over bytes shares the caller's buffer until it is written to, so this is not a copy
+        return self.upload_stream(io.BytesIO(file_data), len(file_data), filename, content_type)
+    
+    def upload_stream(self, stream: BinaryIO, length: Optional[int], filename: str,
+                      content_type: Optional[str] = None) -> bool:
+        """Upload from a file-like object without buffering the whole file
+
+        With a known length MinIO reads exactly that many bytes, otherwise the
+        stream is sent as a multipart upload of UPLOAD_PART_SIZE parts. Parts are
+        uploaded one at a time (the transfers themselves already run in
+        parallel), so memory is bounded by the part size, not the file size.
+        """
         try:
-            # Create a BytesIO object for MinIO upload
-            file_stream = io.BytesIO(file_data)
-            file_stream.seek(0)
-            
             # Determine content type if not provided
             if not content_type:
                 _, ext = os.path.splitext(filename)
@@ -43,8 +51,10 @@ class MinioManager:
             self.client.put_object(
                 MINIO_BUCKET,
                 filename,
-                file_stream,
-                length=len(file_data),
+                stream,
+                length=length if length is not None else -1,
+                part_size=0 if length is not None else UPLOAD_PART_SIZE,
+                num_parallel_uploads=1,
                 content_type=content_type
             )
             return True
@@ -1,31 +1,63 @@
 import cv2
-import queue
 import threading
 import time
 from typing import List
 import numpy as np
-from config import RESIZE_DIMENSIONS, CAMERA_URL, FRAME_RATE_LIMIT, RUNTIME_MINUTES
-from image_consumer import consumer
-from model_predictor import ModelPredictor
+from config import (
+    RESIZE_DIMENSIONS, CAMERA_URL, FRAME_RATE_LIMIT, RUNTIME_SECONDS, MAX_FRAMES,
+    HEADLESS, STORAGE_SYSTEM, CONSUMER_THREADS, BUFFER_SIZE, CAPTURE_DECODE_SIZE
+)
+from capture import open_capture
+from image_consumer import consumer, metrics_reporter, FrameQueue, ConsumerMetrics
+from minio_storage import MinIOStorage
+from deduplicator import FrameDeduplicator
+from storage_keys import KeyGenerator, ManifestWriter
+from model_predictor import ModelPredictor, PredictionWorker
 
 class CameraHandler:
     def __init__(self) -> None:
-        self.buffer: queue.Queue = queue.Queue()
+        self.buffer: FrameQueue = FrameQueue(BUFFER_SIZE)
+        self.metrics: ConsumerMetrics = ConsumerMetrics()
+        self.deduplicator: FrameDeduplicator = FrameDeduplicator()
+        self.key_generator: KeyGenerator = KeyGenerator()
         # CAMERA_URL is validated in config.py, so it should not be None here
         if CAMERA_URL is None:
             raise ValueError("CAMERA_URL is None - this should not happen after validation")
-        self.cap: cv2.VideoCapture = cv2.VideoCapture(CAMERA_URL)
+        self.cap = open_capture(CAMERA_URL, size=CAPTURE_DECODE_SIZE)
         self.consumer_threads: List[threading.Thread] = []
         self.stop_flag: threading.Event = threading.Event()
+        self.reporter_thread: threading.Thread | None = None
+        self.reporter_stop: threading.Event = threading.Event()
         
-        # Initialize model predictor
+        # Initialize model predictor, inference runs on its own thread
         self.model_predictor = ModelPredictor()
+        self.prediction_worker = PredictionWorker(self.model_predictor)
         
     def start_consumer_threads(self) -> None:
         """Start the consumer threads"""
-        self.consumer_threads.append(threading.Thread(target=consumer, args=(self.buffer, self.stop_flag)))
+        minio_storage: MinIOStorage | None = None
+
+        # One MinIO client (and its connection pool) shared by all consumers
+        if STORAGE_SYSTEM == "minio":
+            try:
+                minio_storage = MinIOStorage()
+                print("MinIO storage initialized")
+            except Exception as e:
+                print(f"Failed to initialize MinIO storage: {e}")
+
+        manifest = ManifestWriter(minio_storage)
+
+        for _ in range(CONSUMER_THREADS):
+            self.consumer_threads.append(threading.Thread(
+                target=consumer,
+                args=(self.buffer, self.stop_flag, self.metrics, self.deduplicator, manifest, minio_storage)
+            ))
+        # Stopped on its own event, after the consumers drained the queue, so its final manifest sync sees every frame
+        self.reporter_thread = threading.Thread(
+            target=metrics_reporter, args=(self.buffer, self.metrics, self.deduplicator, manifest, self.reporter_stop)
+        )
         
-        for thread in self.consumer_threads:
+        for thread in [*self.consumer_threads, self.reporter_thread]:
             thread.daemon = True  # Make threads daemon so they exit when main thread exits
             thread.start()
     
@@ -34,12 +66,22 @@ class CameraHandler:
         print("Stopping camera handler...")
         self.stop_flag.set()
         
-    def process_frames(self) -> None:
-        """Main frame processing loop"""
+    def process_frames(self, headless: bool = HEADLESS, runtime_seconds: float = RUNTIME_SECONDS,
+                       max_frames: int = MAX_FRAMES) -> None:
+        """Main frame processing loop
+
+        Every processed frame goes to the storage buffer. In headless mode
+        there are no GUI calls, otherwise a preview window with the latest
+        prediction is shown. The loop ends after runtime_seconds or max_frames
+        (0 disables a limit).
+        """
         start_time: float = time.time()
         last_time: float = time.time()
+        processed_frames: int = 0
         
-        cv2.namedWindow("frame", cv2.WINDOW_NORMAL)
+        if not headless:
+            cv2.namedWindow("frame", cv2.WINDOW_NORMAL)
+        self.prediction_worker.start()
         
         try:
             while self.cap.isOpened() and not self.stop_flag.is_set():
@@ -57,44 +99,69 @@ class CameraHandler:
                     continue
 
                 # Check if runtime limit has been reached
-                if curr_time - start_time > 60 * RUNTIME_MINUTES:
+                if runtime_seconds and curr_time - start_time > runtime_seconds:
                     print("Shutdown - runtime limit reached")
                     break
+
+                # Check if frame limit has been reached
+                if max_frames and processed_frames >= max_frames:
+                    print("Shutdown - frame limit reached")
+                    break
                 last_time = curr_time
+                processed_frames += 1
+                
+                # Frames decoded at the storage size are used as is
+                resized_image: np.ndarray = frame
+                if (frame.shape[1], frame.shape[0]) != RESIZE_DIMENSIONS:
+                    resized_image = cv2.resize(frame, RESIZE_DIMENSIONS, interpolation=cv2.INTER_AREA)
+                # Keyed at capture time, consumers may pick frames up much later (and out of order)
+                key, captured_at = self.key_generator.next_key()
+                self.buffer.put_latest((key, captured_at, resized_image))
                 
-                resized_image: np.ndarray = cv2.resize(frame, RESIZE_DIMENSIONS, interpolation=cv2.INTER_AREA)
-                #self.buffer.put(resized_image)
+                # Prediction runs on the worker, the loop only hands over the newest frame
+                self.prediction_worker.submit(frame)
                 
-                # Make prediction on the cropped image
-                prediction, confidence = self.model_predictor.predict(frame)
+                if headless:
+                    continue
+                
+                # Overlays are only rendered for the preview window
+                preview: np.ndarray = frame.copy()
+                prediction, confidence = self.prediction_worker.latest
                 
                 # Add prediction text to the frame
                 prediction_text = f"Gate Status: {prediction} ({confidence:.2f})"
-                cv2.putText(frame, prediction_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                cv2.putText(preview, prediction_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
                            1, (0, 255, 0) if prediction == "Open" else (0, 0, 255), 2)
                 
                 # Add timestamp
                 timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                cv2.putText(frame, timestamp, (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 
+                cv2.putText(preview, timestamp, (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 
                            0.7, (255, 255, 255), 2)
                 
-                cv2.imshow('frame', frame)
+                cv2.imshow('frame', preview)
                 
-                if cv2.waitKey(20) & 0xFF == ord('q'):
+                if cv2.waitKey(1) & 0xFF == ord('q'):
                     print("Shutdown - 'q' key pressed")
                     break
                     
         except KeyboardInterrupt:
             print("Interrupted during frame processing")
         finally:
-            cv2.destroyAllWindows()
+            elapsed: float = max(time.time() - start_time, 1e-6)
+            print(f"Processed {processed_frames} frames in {elapsed:.0f}s ({processed_frames / elapsed:.2f}/s), "
+                  f"{self.prediction_worker.predictions} predictions")
+            self.prediction_worker.stop()
+            if not headless:
+                cv2.destroyAllWindows()
     
     def cleanup(self) -> None:
         """Clean up resources"""
         print("Cleaning up camera handler...")
         
-        # Signal threads to stop
+        # Signal threads to stop, the consumers first store the frames still queued
         self.stop_flag.set()
+        if self.buffer.qsize():
+            print(f"Storing {self.buffer.qsize()} queued frames...")
         
         # Wait for consumer threads to finish (with timeout)
         for thread in self.consumer_threads:
@@ -103,6 +170,11 @@ class CameraHandler:
                 if thread.is_alive():
                     print(f"Warning: Thread {thread.name} did not stop gracefully")
         
+        # Final metrics report and manifest sync
+        self.reporter_stop.set()
+        if self.reporter_thread is not None:
+            self.reporter_thread.join(timeout=5.0)
+        
         # Release camera
         if self.cap.isOpened():
             self.cap.release()
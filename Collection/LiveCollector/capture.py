@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+from config import (
+    CAPTURE_BACKEND, CAPTURE_SUBSTREAM, CAPTURE_TRANSPORT, CAPTURE_THREADS,
+    CAPTURE_SKIP_FRAME, CAPTURE_LOW_DELAY, CAPTURE_HW_ACCEL, CAPTURE_TIMEOUT
+)
+
+# Options that belong to the demuxer, everything else is handed to the decoder
+FORMAT_OPTIONS: Tuple[str, ...] = ("rtsp_transport", "fflags")
+
+# Main stream -> substream rewrites for the common camera URL layouts
+SUBSTREAM_PATTERNS: list = [
+    (r"(/Streaming/Channels/\d+)01\b", r"\g<1>02"),   # Hikvision
+    (r"/main/", "/sub/"),                             # Hikvision (legacy)
+    (r"subtype=0\b", "subtype=1"),                    # Dahua / Amcrest
+    (r"_main\b", "_sub"),                             # Reolink
+]
+
+def substream_url(url: str, substream: str = CAPTURE_SUBSTREAM) -> str:
+    """Return the URL to open, the camera's lower resolution substream when requested"""
+    if substream.lower() in ("", "false"):
+        return url
+
+    # An explicit URL always wins over guessing
+    if substream.lower() != "true":
+        return substream
+
+    for pattern, replacement in SUBSTREAM_PATTERNS:
+        rewritten = re.sub(pattern, replacement, url)
+        if rewritten != url:
+            return rewritten
+
+    print("Could not derive a substream URL, using the main stream (set CAPTURE_SUBSTREAM to the URL instead)")
+    return url
+
+def decoder_options(url: str, transport: str = CAPTURE_TRANSPORT, threads: int = CAPTURE_THREADS,
+                    skip_frame: str = CAPTURE_SKIP_FRAME, low_delay: bool = CAPTURE_LOW_DELAY) -> Dict[str, str]:
+    """FFmpeg options (name -> value) for the given source"""
+    options: Dict[str, str] = {}
+    if url.startswith(("rtsp://", "rtsps://")) and transport:
+        options["rtsp_transport"] = transport
+    if threads:
+        options["threads"] = str(threads)
+    if skip_frame and skip_frame != "default":
+        options["skip_frame"] = skip_frame
+    if low_delay:
+        options["fflags"] = "nobuffer"
+        options["flags"] = "low_delay"
+    return options
+
+def ffmpeg_capture_options(options: Dict[str, str]) -> str:
+    """Encode the options in the OPENCV_FFMPEG_CAPTURE_OPTIONS format ("name;value|name;value")"""
+    return "|".join(f"{name};{value}" for name, value in options.items())
+
+class OpenCVCapture:
+    """cv2.VideoCapture opened with the FFmpeg options from OPENCV_FFMPEG_CAPTURE_OPTIONS
+
+    Demuxer options always apply, the decoder options (threads, skip_frame, flags)
+    only reach the decoder on OpenCV builds that forward them - use the pyav
+    backend when those matter. OpenCV cannot scale while decoding, so frames are
+    resized after the read when a size is given.
+    """
+
+    # OPENCV_FFMPEG_CAPTURE_OPTIONS is process wide and only read while opening
+    _environment_lock: threading.Lock = threading.Lock()
+
+    def __init__(self, url: str, options: Dict[str, str], size: Optional[Tuple[int, int]] = None,
+                 timeout: float = CAPTURE_TIMEOUT, hw_accel: bool = CAPTURE_HW_ACCEL) -> None:
+        self.size = size
+
+        # Bounded open/read so a dead stream surfaces as a failed read instead of hanging
+        params: list = []
+        if timeout and hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
+            params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(timeout * 1000), cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(timeout * 1000)]
+        if "threads" in options and hasattr(cv2, "CAP_PROP_N_THREADS"):
+            params += [cv2.CAP_PROP_N_THREADS, int(options["threads"])]
+        if hw_accel and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+        with OpenCVCapture._environment_lock:
+            # Options set explicitly in the environment are left untouched
+            user_options: Optional[str] = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+            if user_options is None:
+                os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = ffmpeg_capture_options(options)
+            try:
+                self.capture: cv2.VideoCapture = cv2.VideoCapture(url, cv2.CAP_FFMPEG, params)
+            finally:
+                if user_options is None:
+                    del os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        success, frame = self.capture.read()
+        if frame is not None and self.size is not None and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return success, frame
+
+    def release(self) -> None:
+        self.capture.release()
+
+class PyAVCapture:
+    """Decode through PyAV
+
+    PyAV applies every decoder option directly and scales inside the colour
+    conversion (one swscale pass) instead of after it.
+    """
+
+    def __init__(self, url: str, options: Dict[str, str], size: Optional[Tuple[int, int]] = None,
+                 timeout: float = CAPTURE_TIMEOUT) -> None:
+        import av
+
+        self.av = av
+        self.size = size
+        self.container = None
+
+        format_options = {name: value for name, value in options.items() if name in FORMAT_OPTIONS}
+        codec_options = {name: value for name, value in options.items() if name not in FORMAT_OPTIONS}
+
+        try:
+            self.container = av.open(url, options=format_options, timeout=timeout)
+        except av.error.FFmpegError as e:
+            print(f"Failed to open {url}: {e}")
+            return
+
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.stream.codec_context.options = codec_options
+        self.frames = self.container.decode(self.stream)
+
+    def isOpened(self) -> bool:
+        return self.container is not None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.container is None:
+            return False, None
+
+        try:
+            frame = next(self.frames)
+        except (StopIteration, self.av.error.FFmpegError):
+            return False, None
+
+        if self.size is None:
+            return True, frame.to_ndarray(format="bgr24")
+
+        width, height = self.size
+        return True, frame.reformat(width=width, height=height, format="bgr24", interpolation="AREA").to_ndarray()
+
+    def release(self) -> None:
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+capture_backends: dict = {
+    "opencv": OpenCVCapture,
+    "pyav": PyAVCapture,
+}
+
+def open_capture(url: str, size: Optional[Tuple[int, int]] = None, backend: str = CAPTURE_BACKEND,
+                 options: Optional[Dict[str, str]] = None, timeout: float = CAPTURE_TIMEOUT):
+    """Open the (sub)stream with the configured backend
+
+    Same module as GateStatus' Services/Capture.py. Every backend exposes the
+    isOpened / read / release subset of cv2.VideoCapture, read() returns BGR
+    frames at size (width, height) when one is given.
+    """
+    if backend not in capture_backends:
+        raise ValueError(f"Unknown capture backend '{backend}', expected one of {list(capture_backends)}")
+
+    url = substream_url(url)
+    if options is None:
+        options = decoder_options(url)
+
+    return capture_backends[backend](url, options, size=size, timeout=timeout)
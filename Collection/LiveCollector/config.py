@@ -43,7 +43,34 @@ def validate_config() -> None:
         if not MINIO_BUCKET:
             raise ValueError("MINIO_BUCKET is required when STORAGE_SYSTEM is 'minio'")
 
+# Consumer Configuration
+CONSUMER_THREADS: int = int(os.getenv("CONSUMER_THREADS", "4"))
+BUFFER_SIZE: int = int(os.getenv("BUFFER_SIZE", "32"))  # frames, the oldest is dropped when full
+METRICS_INTERVAL: float = float(os.getenv("METRICS_INTERVAL", "60"))  # seconds between metrics reports
+
+# Deduplication Configuration
+DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD: int = int(os.getenv("DEDUP_THRESHOLD", "6"))  # dHash bits (of 64) that must differ
+DEDUP_WINDOW: int = int(os.getenv("DEDUP_WINDOW", "10"))  # recent stored frames to compare against
+KEYFRAME_INTERVAL: float = float(os.getenv("KEYFRAME_INTERVAL", "300"))  # seconds, store a frame at least this often
+
+# Capture Configuration
+CAPTURE_BACKEND: str = os.getenv("CAPTURE_BACKEND", "opencv").lower()  # opencv | pyav
+CAPTURE_SUBSTREAM: str = os.getenv("CAPTURE_SUBSTREAM", "false")  # false | true | explicit substream URL
+CAPTURE_TRANSPORT: str = os.getenv("CAPTURE_TRANSPORT", "tcp").lower()  # tcp | udp
+CAPTURE_THREADS: int = int(os.getenv("CAPTURE_THREADS", "2"))  # decoder threads, 0 lets FFmpeg decide
+CAPTURE_SKIP_FRAME: str = os.getenv("CAPTURE_SKIP_FRAME", "default")  # default | nonref | nokey
+CAPTURE_LOW_DELAY: bool = os.getenv("CAPTURE_LOW_DELAY", "true").lower() == "true"
+CAPTURE_HW_ACCEL: bool = os.getenv("CAPTURE_HW_ACCEL", "false").lower() == "true"
+CAPTURE_TIMEOUT: float = float(os.getenv("CAPTURE_TIMEOUT", "10"))  # seconds an open/read may block
+_decode_size: str = os.getenv("CAPTURE_DECODE_SIZE", "")  # WIDTHxHEIGHT, keep unset - the model crop uses full resolution pixel offsets
+CAPTURE_DECODE_SIZE: Optional[Tuple[int, int]] = (
+    (int(_decode_size.split("x")[0]), int(_decode_size.split("x")[1])) if _decode_size else None
+)
+
 # Runtime configuration
 FRAME_RATE_LIMIT: float = 1 #0.05  # seconds between frames
-RUNTIME_MINUTES: int = 5
+HEADLESS: bool = os.getenv("HEADLESS", "false").lower() == "true"  # no preview window, frames go straight to storage
+RUNTIME_SECONDS: float = float(os.getenv("RUNTIME_SECONDS", "300"))  # 0 runs until stopped
+MAX_FRAMES: int = int(os.getenv("MAX_FRAMES", "0"))  # 0 means no frame limit
 RESIZE_DIMENSIONS: Tuple[int, int] = (640, 360)
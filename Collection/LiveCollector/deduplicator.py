@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import deque
+from typing import Deque
+import numpy as np
+from config import DEDUP_ENABLED, DEDUP_THRESHOLD, DEDUP_WINDOW, KEYFRAME_INTERVAL
+from utils import dhash, hamming_distance
+
+class FrameDeduplicator:
+    """Drop frames that look like one of the recently stored frames.
+
+    A frame is kept when its dHash differs by more than `threshold` bits from
+    every hash in the rolling window of the last `window` stored frames, or when
+    `keyframe_interval` seconds passed since the last stored frame.
+    """
+
+    def __init__(self, enabled: bool = DEDUP_ENABLED, threshold: int = DEDUP_THRESHOLD,
+                 window: int = DEDUP_WINDOW, keyframe_interval: float = KEYFRAME_INTERVAL) -> None:
+        self.enabled = enabled
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.recent_hashes: Deque[int] = deque(maxlen=window)
+        self.last_stored: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+        self.seen: int = 0
+        self.kept: int = 0
+
+    def should_store(self, image: np.ndarray) -> bool:
+        """Return True if the frame is new enough to be stored"""
+        if not self.enabled:
+            return True
+
+        image_hash = dhash(image)
+        now = time.time()
+
+        # Shared by all consumer threads
+        with self.lock:
+            self.seen += 1
+
+            is_keyframe = now - self.last_stored >= self.keyframe_interval
+            is_new = all(hamming_distance(image_hash, recent) > self.threshold for recent in self.recent_hashes)
+            if not (is_keyframe or is_new):
+                return False
+
+            self.recent_hashes.append(image_hash)
+            self.last_stored = now
+            self.kept += 1
+            return True
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Fraction of frames that were not stored"""
+        with self.lock:
+            return 1 - self.kept / self.seen if self.seen else 0.0
@@ -1,71 +1,126 @@
 import cv2
 import os
-from datetime import datetime
-from pathlib import Path
 import queue
 import threading
 import time
-from config import OUTPUT_DIR, STORAGE_SYSTEM
+from typing import Any, Optional
+from config import STORAGE_SYSTEM, METRICS_INTERVAL
 from minio_storage import MinIOStorage
+from deduplicator import FrameDeduplicator
+from storage_keys import ManifestWriter, local_path
 
-def consumer(buffer: queue.Queue, stop_flag: threading.Event) -> None:
-    """Consumer thread that saves images based on the configured storage system"""
-    minio_storage: MinIOStorage | None = None
-    
+class FrameQueue(queue.Queue):
+    """Bounded queue that drops the oldest frame instead of blocking the camera loop"""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self.dropped: int = 0
+
+    def put_latest(self, item: Any) -> None:
+        """Put an item, evicting the oldest queued item while the queue is full"""
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+class ConsumerMetrics:
+    """Throughput counters shared by all consumer threads"""
+
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.stored: int = 0
+        self.failed: int = 0
+        self.bytes: int = 0
+        self.start_time: float = time.time()
+
+    def record(self, success: bool, size: int = 0) -> None:
+        with self.lock:
+            if success:
+                self.stored += 1
+                self.bytes += size
+            else:
+                self.failed += 1
+
+    def report(self, buffer: FrameQueue, deduplicator: FrameDeduplicator) -> str:
+        with self.lock:
+            elapsed = max(time.time() - self.start_time, 1e-6)
+            return (f"queue {buffer.qsize()}/{buffer.maxsize} | stored {self.stored} ({self.stored / elapsed:.2f}/s, "
+                    f"{self.bytes / elapsed / 1024:.0f}KB/s) | failed {self.failed} | dropped {buffer.dropped} | "
+                    f"deduplicated {deduplicator.reduction_ratio * 100:.1f}%")
+
+def metrics_reporter(buffer: FrameQueue, metrics: ConsumerMetrics, deduplicator: FrameDeduplicator,
+                     manifest: ManifestWriter, stop_flag: threading.Event) -> None:
+    """Print queue depth, throughput and storage reduction and sync the manifests every METRICS_INTERVAL seconds"""
+    while not stop_flag.wait(METRICS_INTERVAL):
+        print(f"Consumer metrics: {metrics.report(buffer, deduplicator)}")
+        manifest.sync()
+    print(f"Consumer metrics: {metrics.report(buffer, deduplicator)}")
+    manifest.sync()
+
+def consumer(buffer: FrameQueue, stop_flag: threading.Event, metrics: ConsumerMetrics,
+             deduplicator: FrameDeduplicator, manifest: ManifestWriter,
+             minio_storage: Optional[MinIOStorage] = None) -> None:
+    """Consumer thread that saves the queued (key, capture time, image) frames to the configured storage system"""
     if STORAGE_SYSTEM == "none":
         print("Storage system is set to none, no images will be saved")
         return
 
-    # Initialize MinIO storage if using MinIO
-    if STORAGE_SYSTEM == "minio":
-        try:
-            minio_storage = MinIOStorage()
-            print("MinIO storage initialized")
-        except Exception as e:
-            print(f"Failed to initialize MinIO storage: {e}")
-            minio_storage = None
+    if STORAGE_SYSTEM == "minio" and minio_storage is None:
+        print("MinIO storage is not available, consumer thread exiting")
+        return
     
-    while not stop_flag.is_set():
+    # After stop_flag is set the frames already queued are still stored, the thread exits once the queue is empty
+    while True:
         try:
             # retrieve an item with timeout to allow checking stop_flag
-            current_image = buffer.get(timeout=1.0)
-            if current_image is None:
+            item = buffer.get(timeout=1.0)
+        except queue.Empty:
+            if stop_flag.is_set():
+                break
+            continue
+
+        try:
+            if item is None:
+                continue
+            key, timestamp, current_image = item
+
+            # Skip near duplicates of recently stored frames
+            if not deduplicator.should_store(current_image):
                 continue
             
-            # Generate filename using epoch time
-            epoch_time = int(time.time())
-            filename = f"{epoch_time}.jpg"
+            # The unique, hour partitioned key was taken at capture time
+            size = 0
             
-            # Create output directory if using local storage
             if STORAGE_SYSTEM == "local":
-                local_date_str: str = datetime.now().strftime('%Y%m%d')
-                output_path: str = os.path.join(OUTPUT_DIR, local_date_str)
-                
-                if not os.path.exists(output_path):
-                    path = Path(output_path)
-                    path.mkdir(parents=True)
-
                 # Save to local file system
-                image_filename = os.path.join(output_path, filename)
-                cv2.imwrite(image_filename, current_image)
-                
-                print(f"Saved locally: {image_filename}")
+                image_filename = local_path(key)
+                if cv2.imwrite(image_filename, current_image):
+                    size = os.path.getsize(image_filename)
+                    print(f"Saved locally: {image_filename}")
             
             # Upload to MinIO if using MinIO storage
             elif STORAGE_SYSTEM == "minio" and minio_storage is not None:
-                try:
-                    # Upload original image
-                    if minio_storage.upload_cv2_image(current_image, filename):
-                        print(f"Uploaded to MinIO: {filename}")
-                        
-                except Exception as e:
-                    print(f"Failed to upload to MinIO: {e}")
+                # Encode once, the JPEG buffer is only copied into the upload stream
+                encoded, encoded_image = cv2.imencode('.jpg', current_image)
+                if encoded and minio_storage.upload_image(encoded_image, key):
+                    size = encoded_image.size
+                    print(f"Uploaded to MinIO: {key}")
+
+            metrics.record(size > 0, size)
+            if size > 0:
+                manifest.append(key, timestamp, size)
             
-        except queue.Empty:
-            # Timeout occurred, check stop_flag and continue
-            continue
         except Exception as e:
+            metrics.record(False)
             print(f"Error in consumer thread: {e}")
-            continue
+        finally:
+            buffer.task_done()
     
-    print("Consumer thread stopped") 
\ No newline at end of file
+    print("Consumer thread stopped") 
@@ -1,7 +1,8 @@
 import io
 import cv2
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
+import numpy as np
 from minio import Minio
 from minio.error import S3Error
 from config import (
@@ -42,15 +43,16 @@ class MinIOStorage:
         except S3Error as e:
             raise ValueError(f"Failed to create/access bucket {self.bucket}: {e}")
     
-    def upload_image(self, image: bytes, filename: str, content_type: str = "image/jpeg") -> bool:
-        """Upload an image to MinIO"""
+    def upload_image(self, image: Union[bytes, np.ndarray], filename: str, content_type: str = "image/jpeg") -> bool:
+        """Upload an encoded image (bytes or a cv2.imencode buffer) to MinIO"""
         try:
+            # BytesIO copies the buffer once, put_object needs a stream
             image_data = io.BytesIO(image)
             self.client.put_object(
                 self.bucket,
                 filename,
                 image_data,
-                length=len(image),
+                length=image_data.getbuffer().nbytes,
                 content_type=content_type
             )
             return True
@@ -67,11 +69,8 @@ class MinIOStorage:
                 print(f"Failed to encode image: {filename}")
                 return False
             
-            # Convert to bytes
-            image_bytes = encoded_image.tobytes()
-            
-            # Upload to MinIO
-            return self.upload_image(image_bytes, filename)
+            # Upload the encoded buffer directly
+            return self.upload_image(encoded_image, filename)
             
         except Exception as e:
             print(f"Error uploading cv2 image {filename}: {e}")
@@ -1,9 +1,10 @@
 import os
-import cv2
+import threading
 import numpy as np
 from typing import Optional, Tuple
 import tensorflow as tf
 from pathlib import Path
+from preprocessing import FramePreprocessor
 
 class ModelPredictor:
     def __init__(self, model_path: str = "../../models/Old Garage Model") -> None:
@@ -11,6 +12,7 @@ class ModelPredictor:
         self.model_path = Path(model_path)
         self.model: Optional[tf.keras.Model] = None
         self.labels: list = []
+        self.preprocessor = FramePreprocessor()
         self.load_model()
     
     def load_model(self) -> None:
@@ -54,30 +56,7 @@ class ModelPredictor:
     def preprocess_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Preprocess frame for model input using the exact method from training"""
         try:
-            # Crop image
-            (h, w) = frame.shape[:2]
-            image = frame[:h - 225, 200:w - 150] 
-
-            # Resize image to 224x224
-            resized_image = cv2.resize(image, (224, 224))
-
-            # Convert BGR to RGB
-            image = cv2.cvtColor(resized_image, cv2.COLOR_BGR2RGB)
-            
-            # Convert the image to grayscale
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-            
-            # Add channel dimension
-            image = np.expand_dims(image, axis=-1)
-            
-            # Rescale the image array to [0, 1]
-            image = (image / 255.0)
-        
-            # Reshape for model input (batch, height, width, channels)
-            image = image.reshape(1, 224, 224, 1)
-        
-            return image, resized_image
-            
+            return self.preprocessor(frame)
         except Exception as e:
             print(f"Error preprocessing frame: {e}")
             return None, None
@@ -114,4 +93,51 @@ class ModelPredictor:
     
     def is_model_loaded(self) -> bool:
         """Check if model is loaded successfully"""
-        return self.model is not None 
\ No newline at end of file
+        return self.model is not None
+
+
+class PredictionWorker:
+    """Run ModelPredictor on its own thread so the capture loop never waits on inference
+
+    Only the newest submitted frame is kept, frames that arrive while a
+    prediction is running replace each other.
+    """
+
+    def __init__(self, model_predictor: ModelPredictor) -> None:
+        self.model_predictor = model_predictor
+        self.condition: threading.Condition = threading.Condition()
+        self.pending: Optional[np.ndarray] = None
+        self.latest: Tuple[str, float] = ("Unknown", 0.0)
+        self.predictions: int = 0
+        self.stop_flag: threading.Event = threading.Event()
+        self.thread: threading.Thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Start the prediction thread"""
+        self.thread.start()
+
+    def submit(self, frame: np.ndarray) -> None:
+        """Queue a frame for prediction, replacing any frame still waiting"""
+        with self.condition:
+            self.pending = frame
+            self.condition.notify()
+
+    def stop(self) -> None:
+        """Stop the prediction thread"""
+        self.stop_flag.set()
+        with self.condition:
+            self.condition.notify()
+        self.thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        while not self.stop_flag.is_set():
+            with self.condition:
+                while self.pending is None and not self.stop_flag.is_set():
+                    self.condition.wait()
+                frame, self.pending = self.pending, None
+
+            if frame is None:
+                continue
+
+            self.latest = self.model_predictor.predict(frame)
+            self.predictions += 1
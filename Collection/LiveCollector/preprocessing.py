@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+from typing import Tuple
+
+MODEL_INPUT_SIZE: Tuple[int, int] = (224, 224)
+
+class FramePreprocessor:
+    """Crop -> resize -> gray -> [0, 1] float32 into preallocated buffers.
+
+    Same kernel as GateStatus' Services/Preprocessing.py. The returned arrays are
+    overwritten on the next call, copy them if they need to outlive it.
+    """
+
+    def __init__(self, size: Tuple[int, int] = MODEL_INPUT_SIZE, crop_bottom: int = 225,
+                 crop_left: int = 200, crop_right: int = 150) -> None:
+        self.size = size
+        self.crop_bottom = crop_bottom
+        self.crop_left = crop_left
+        self.crop_right = crop_right
+
+        width, height = size
+        self._resized: np.ndarray = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray: np.ndarray = np.empty((height, width), dtype=np.uint8)
+        self._output: np.ndarray = np.empty((1, height, width, 1), dtype=np.float32)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """Crop the gate region (a view, no pixels are copied)"""
+        (h, w) = frame.shape[:2]
+        return frame[:h - self.crop_bottom, self.crop_left:w - self.crop_right]
+
+    def __call__(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (model_input, resized_image) for a BGR frame"""
+        cv2.resize(self.crop(frame), self.size, dst=self._resized)
+
+        # BGR2GRAY gives the same result as BGR2RGB followed by RGB2GRAY
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        np.multiply(self._gray, np.float32(1 / 255.0), out=self._output[0, :, :, 0], casting='unsafe')
+
+        return self._output, self._resized
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from config import OUTPUT_DIR
+
+class KeyGenerator:
+    """Generate unique, time partitioned object keys
+
+    Keys look like YYYY/MM/DD/HH/<epoch_ms>_<seq>.jpg, the per millisecond
+    sequence keeps frames from the same millisecond (or threads) apart. When
+    the wall clock steps backwards the last millisecond is kept and only the
+    sequence grows until the clock catches up, so keys never repeat.
+    """
+
+    def __init__(self, extension: str = "jpg") -> None:
+        self.extension = extension
+        self.lock: threading.Lock = threading.Lock()
+        self.last_ms: int = 0
+        self.sequence: int = 0
+
+    def next_key(self) -> Tuple[str, datetime]:
+        """Return (key, capture time) for a new frame, called by the camera loop when the frame is captured"""
+        with self.lock:
+            epoch_ms = int(time.time() * 1000)
+            if epoch_ms <= self.last_ms:
+                epoch_ms = self.last_ms
+                self.sequence += 1
+            else:
+                self.last_ms = epoch_ms
+                self.sequence = 0
+            sequence = self.sequence
+
+        timestamp = datetime.fromtimestamp(epoch_ms / 1000)
+        return f"{timestamp:%Y/%m/%d/%H}/{epoch_ms}_{sequence:03d}.{self.extension}", timestamp
+
+class ManifestWriter:
+    """Append one JSON line per stored frame to a per-day manifest (manifests/YYYY-MM-DD.jsonl)
+
+    Manifests are written under OUTPUT_DIR, when a MinIO storage is given the
+    day's manifest is uploaded to the same key in the bucket on sync().
+    """
+
+    def __init__(self, minio_storage: Optional[Any] = None, output_dir: str = OUTPUT_DIR) -> None:
+        self.minio_storage = minio_storage
+        self.manifest_dir = Path(output_dir) / "manifests"
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        self.lock: threading.Lock = threading.Lock()
+        self.dirty_days: set = set()
+
+    def append(self, key: str, timestamp: datetime, size: int) -> None:
+        """Record a stored frame"""
+        day = timestamp.strftime('%Y-%m-%d')
+        entry: Dict[str, Any] = {"key": key, "timestamp": timestamp.isoformat(), "size": size}
+
+        with self.lock:
+            with open(self.manifest_dir / f"{day}.jsonl", "a") as manifest:
+                manifest.write(json.dumps(entry) + "\n")
+            self.dirty_days.add(day)
+
+    def sync(self) -> None:
+        """Upload the manifests that changed since the last sync"""
+        if self.minio_storage is None:
+            return
+
+        with self.lock:
+            days, self.dirty_days = self.dirty_days, set()
+            manifests = {day: (self.manifest_dir / f"{day}.jsonl").read_bytes() for day in days}
+
+        for day, data in manifests.items():
+            if not self.minio_storage.upload_image(data, f"manifests/{day}.jsonl", content_type="application/x-ndjson"):
+                with self.lock:
+                    self.dirty_days.add(day)
+
+def local_path(key: str, output_dir: str = OUTPUT_DIR) -> str:
+    """Local file path for a key, creating its directory"""
+    path = os.path.join(output_dir, *key.split("/"))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return path
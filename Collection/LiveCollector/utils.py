@@ -9,3 +9,14 @@ def mse(img1: np.ndarray, img2: np.ndarray) -> Tuple[Union[float, np.floating],
     err = np.sum(diff**2)
     mse = err/(float(h*w))
     return mse, diff
+
+def dhash(img: np.ndarray, hash_size: int = 8) -> int:
+    """Compute a difference hash (dHash) of an image as a hash_size*hash_size bit integer"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(hash1 ^ hash2).count('1')
@@ -3,7 +3,7 @@ import { useState } from 'react';
 import { useAuthState } from "react-firebase-hooks/auth";
 import { useObject } from 'react-firebase-hooks/database';
 
-import { ref, set } from "firebase/database";
+import { ref, set, serverTimestamp } from "firebase/database";
 import { v4 as uuidv4 } from 'uuid';
 
 import { auth, db } from '../firebase';
@@ -54,7 +54,8 @@ const Authed = () => {
                     email: user.email,
                     photo: user.photoURL,
                 },
-                data: {}
+                data: {},
+                timestamp: serverTimestamp()
             }
         );
     };
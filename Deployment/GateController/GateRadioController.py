@@ -1,57 +1,26 @@
-import RPi.GPIO as GPIO
-import time
+from RadioWaveform import compile_pulse_train, create_backend
 
-# ------------------------------------------------------------------ #
-
-_gpio = 27
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(_gpio, GPIO.OUT)
+import os
 
 # ------------------------------------------------------------------ #
 
-def _sleep_microseconds(ms: int) -> None:
-    delayInSeconds = ms / 1000000
-    _delayInSeconds = delayInSeconds / 100
-    end = time.time() + delayInSeconds - _delayInSeconds
-    while time.time() < end:
-        time.sleep(_delayInSeconds)
-
-# ------------------------------------------------------------------ #
-
-def _pulse(high: int, low: int) -> None:
-    GPIO.output(_gpio, GPIO.HIGH)
-    _sleep_microseconds(high)
-    GPIO.output(_gpio, GPIO.LOW)
-    _sleep_microseconds(low)
+_gpio = 27
 
-# ------------------------------------------------------------------ #
+# The pulse train is compiled once, every operate_gate() only replays it
+_train = compile_pulse_train()
+_backend = create_backend(_gpio)
 
-def _send_code() -> None:
-    _pulse(320, 320)
-    _pulse(676, 320)
-    _pulse(676, 320)
-    _pulse(676, 320)
-    _pulse(676, 676)
-    _pulse(320, 320)
-    _pulse(676, 676)
-    _pulse(320, 320)
-    _pulse(676, 320)
-    _pulse(676, 676)
-    _pulse(320, 320)
-    _pulse(676, 320)
-    _pulse(676, 10004)
+# Number of times the code is sent per button press
+RADIO_REPEAT: int = int(os.getenv('RADIO_REPEAT', '20'))
 
 # ------------------------------------------------------------------ #
 
 def operate_gate() -> None:
     print("Open/Close gate")
 
-    #_send_code()
-
-    for _ in range(0, 20):
-        _send_code()
+    _backend.send(_train, RADIO_REPEAT)
 
 # ------------------------------------------------------------------ #
 
 def cleanup() -> None:
-    GPIO.cleanup()
\ No newline at end of file
+    _backend.cleanup()
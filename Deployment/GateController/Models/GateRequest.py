@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from typing import Optional
 
 from Models.User import User
 
@@ -7,3 +8,4 @@ class GateRequest:
     type: str
     user: User
     data: dict = field(default_factory=dict)
+    timestamp: Optional[float] = None # Firebase server time in ms
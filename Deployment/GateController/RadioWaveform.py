@@ -0,0 +1,191 @@
+import time
+import os
+import re
+
+# ------------------------------------------------------------------ #
+
+GATE_CODE_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gate-code.txt")
+
+# gate-code.txt holds five captures of the remote, the second one (320/676us
+# buckets) is the pulse train the original hand written _send_code() sent
+RADIO_CODE_INDEX: int = int(os.getenv('RADIO_CODE_INDEX', '1'))
+RADIO_BACKEND: str = os.getenv('RADIO_BACKEND', 'spin').lower()
+
+# Sleep through long gaps and only spin for the last part of them
+SPIN_THRESHOLD_NS: int = 1_000_000
+
+# ------------------------------------------------------------------ #
+
+def parse_rfraw(code: str):
+    """
+    Decodes a triq.org rfraw B1 string (AA B1 <n> <n x 16bit bucket us> <data> 55)
+    into [(level, duration_us)]. Every data nibble is one edge: bit 3 is the
+    level (1 = high) and bits 0-2 index the timing bucket.
+    """
+    data = bytes.fromhex(code)
+    if data[0] != 0xAA or data[1] != 0xB1:
+        raise ValueError(f"Unsupported rfraw code: {code}")
+
+    bucket_count = data[2]
+    buckets = [int.from_bytes(data[3 + 2 * i:5 + 2 * i], 'big') for i in range(bucket_count)]
+
+    edges = []
+    for byte in data[3 + 2 * bucket_count:]:
+        if byte == 0x55:
+            break
+        for nibble in (byte >> 4, byte & 0xF):
+            edges.append((bool(nibble & 0x8), buckets[nibble & 0x7]))
+    return edges
+
+
+def compile_pulse_train(path: str = GATE_CODE_PATH, index: int = RADIO_CODE_INDEX):
+    """Compiles a capture from gate-code.txt into [(level, offset_ns)] relative to the train start."""
+    with open(path) as f:
+        codes = re.findall(r"#([0-9A-Fa-f]+)", f.read())
+
+    offset = 0
+    train = []
+    for level, duration_us in parse_rfraw(codes[index]):
+        train.append((level, offset))
+        offset += duration_us * 1000
+
+    # Final edge - back to low once the last gap is over
+    train.append((False, offset))
+    return train
+
+# ------------------------------------------------------------------ #
+
+class FakeGPIO:
+    """Records (level, perf_counter_ns) instead of driving a pin."""
+
+    def __init__(self):
+        self.edges = []
+
+    def output(self, level: bool) -> None:
+        self.edges.append((level, time.perf_counter_ns()))
+
+    def cleanup(self) -> None:
+        pass
+
+
+class RPiGPIO:
+    def __init__(self, pin: int):
+        import RPi.GPIO as GPIO
+
+        self._gpio = GPIO
+        self._pin = pin
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.OUT)
+
+    def output(self, level: bool) -> None:
+        self._gpio.output(self._pin, self._gpio.HIGH if level else self._gpio.LOW)
+
+    def cleanup(self) -> None:
+        self._gpio.cleanup()
+
+# ------------------------------------------------------------------ #
+
+class SpinWaitBackend:
+    """
+    Emits the train against absolute perf_counter_ns deadlines so errors do not
+    accumulate from pulse to pulse. Short waits spin, long gaps sleep first.
+    """
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+
+    def send(self, train, repeat: int) -> None:
+        period = train[-1][1]
+        start = time.perf_counter_ns()
+
+        for i in range(repeat):
+            base = start + i * period
+            for level, offset in train[:-1] if i < repeat - 1 else train:
+                deadline = base + offset
+                remaining = deadline - time.perf_counter_ns()
+                if remaining > SPIN_THRESHOLD_NS:
+                    time.sleep((remaining - SPIN_THRESHOLD_NS) / 1e9)
+                while time.perf_counter_ns() < deadline:
+                    pass
+                self.gpio.output(level)
+
+    def cleanup(self) -> None:
+        self.gpio.cleanup()
+
+
+class PigpioBackend:
+    """Hands the train to the pigpio daemon as a DMA timed wave, no CPU timing at all."""
+
+    def __init__(self, pin: int):
+        import pigpio
+
+        self._pigpio = pigpio
+        self._pin = pin
+        self._pi = pigpio.pi()
+        self._pi.set_mode(pin, pigpio.OUTPUT)
+        self._wave_id = None
+        self._train = None
+
+    def _create_wave(self, train) -> None:
+        mask = 1 << self._pin
+        pulses = []
+        for (level, offset), (_, next_offset) in zip(train, train[1:]):
+            delay_us = (next_offset - offset) // 1000
+            pulses.append(self._pigpio.pulse(mask, 0, delay_us) if level else self._pigpio.pulse(0, mask, delay_us))
+
+        self._pi.wave_clear()
+        self._pi.wave_add_generic(pulses)
+        self._wave_id = self._pi.wave_create()
+        self._train = train
+
+    def send(self, train, repeat: int) -> None:
+        if self._train is not train:
+            self._create_wave(train)
+
+        # Loop the same wave `repeat` times inside the daemon
+        self._pi.wave_chain([255, 0, self._wave_id, 255, 1, repeat & 0xFF, repeat >> 8])
+        while self._pi.wave_tx_busy():
+            time.sleep(0.001)
+        self._pi.write(self._pin, 0)
+
+    def cleanup(self) -> None:
+        self._pi.wave_clear()
+        self._pi.stop()
+
+# ------------------------------------------------------------------ #
+
+def create_backend(pin: int, backend: str = RADIO_BACKEND):
+    if backend == 'spin':
+        return SpinWaitBackend(RPiGPIO(pin))
+    if backend == 'pigpio':
+        return PigpioBackend(pin)
+    if backend == 'fake':
+        return SpinWaitBackend(FakeGPIO())
+    raise ValueError(f"Unknown RADIO_BACKEND '{backend}', expected spin, pigpio or fake")
+
+# ------------------------------------------------------------------ #
+
+def measure_jitter(train, repeat: int = 20):
+    """
+    Sends the train to a fake GPIO and returns (mean, p99, max) pulse width
+    error in us - the receiver decodes pulse widths, not absolute times.
+    """
+    backend = SpinWaitBackend(FakeGPIO())
+    backend.send(train, repeat)
+
+    period = train[-1][1]
+    expected = []
+    for i in range(repeat):
+        expected.extend(i * period + offset for _, offset in (train[:-1] if i < repeat - 1 else train))
+
+    timestamps = [timestamp for _, timestamp in backend.gpio.edges]
+    errors = sorted(
+        abs((timestamps[i + 1] - timestamps[i]) - (expected[i + 1] - expected[i])) / 1000
+        for i in range(len(expected) - 1)
+    )
+    return sum(errors) / len(errors), errors[int(len(errors) * 0.99)], errors[-1]
+
+
+if __name__ == '__main__':
+    mean, p99, worst = measure_jitter(compile_pulse_train())
+    print(f"Pulse width error: mean {mean:.1f}us | p99 {p99:.1f}us | max {worst:.1f}us")
@@ -0,0 +1,140 @@
+from colorama import Fore, Style
+
+from Models.GateRequest import GateRequest
+
+from collections import deque
+
+import threading
+import heapq
+import time
+import os
+
+# ------------------------------------------------------------------ #
+
+# Identical commands accepted within this window are treated as one
+COMMAND_DEDUP_WINDOW: float = float(os.getenv('COMMAND_DEDUP_WINDOW', '2'))
+
+# ------------------------------------------------------------------ #
+
+class CommandScheduler:
+    """
+    Single consumer for gate commands.
+
+    Commands are queued instead of dropped, an identical command that is still
+    pending or arrived within `dedup_window` seconds of the previous one is
+    coalesced. Follow-up actions (e.g. closing the gate after a delay) are
+    timers on the same consumer thread instead of sleeping threads, so the GPIO
+    is only ever driven from one place.
+    """
+
+    def __init__(self, on_command, dedup_window: float = COMMAND_DEDUP_WINDOW):
+        self.on_command = on_command
+        self.dedup_window = dedup_window
+
+        self._condition = threading.Condition()
+        self._commands = []
+        self._timers = []
+        self._timer_keys = {}
+        self._timer_sequence = 0
+        self._last_accepted = {}
+
+        self.latencies = deque(maxlen=1000)
+
+        self.consumer_thread = threading.Thread(target=self.__consumer_thread, args=())
+        self.consumer_thread.daemon = True
+        self.consumer_thread.start()
+
+    # ------------------------------------------------------------------ #
+
+    def submit(self, request: GateRequest) -> None:
+        """Queues a command, never blocks the Firebase listener."""
+        received_at = time.time()
+
+        with self._condition:
+            if any(pending.type == request.type for pending, _ in self._commands):
+                print(f" * {Fore.LIGHTWHITE_EX}Coalescing {request.type}, already pending{Style.RESET_ALL}")
+                return
+
+            if received_at - self._last_accepted.get(request.type, 0) < self.dedup_window:
+                print(f" * {Fore.LIGHTWHITE_EX}Coalescing {request.type}, duplicate within {self.dedup_window}s{Style.RESET_ALL}")
+                return
+
+            self._last_accepted[request.type] = received_at
+            self._commands.append((request, received_at))
+            self._condition.notify()
+
+    def schedule(self, delay_in_seconds: float, action, key: str = None) -> None:
+        """Runs `action` on the consumer thread after the delay, a timer with the same key is replaced."""
+        with self._condition:
+            self._timer_sequence += 1
+            if key is not None:
+                self._timer_keys[key] = self._timer_sequence
+
+            heapq.heappush(self._timers, (time.monotonic() + delay_in_seconds, self._timer_sequence, key, action))
+            self._condition.notify()
+
+    def cancel(self, key: str) -> bool:
+        """Drops the pending timer with this key, returns whether there was one."""
+        with self._condition:
+            return self._timer_keys.pop(key, None) is not None
+
+    def pending(self, key: str) -> bool:
+        with self._condition:
+            return key in self._timer_keys
+
+    # ------------------------------------------------------------------ #
+
+    def __next_task(self):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+
+                # Due timers first, they were scheduled before anything still waiting
+                while self._timers and self._timers[0][0] <= now:
+                    _, sequence, key, action = heapq.heappop(self._timers)
+                    if key is not None:
+                        # Replaced or cancelled
+                        if self._timer_keys.get(key) != sequence:
+                            continue
+                        del self._timer_keys[key]
+                    return action, None
+
+                if self._commands:
+                    return None, self._commands.pop(0)
+
+                timeout = self._timers[0][0] - now if self._timers else None
+                self._condition.wait(timeout)
+
+    def __consumer_thread(self) -> None:
+        while True:
+            action, command = self.__next_task()
+
+            try:
+                if action is not None:
+                    action()
+                    continue
+
+                request, received_at = command
+                self.__execute_command(request, received_at)
+            except Exception as e:
+                print(f"{Fore.LIGHTRED_EX}Command failed: {e}{Style.RESET_ALL}")
+
+    def __execute_command(self, request: GateRequest, received_at: float) -> None:
+        started_at = time.time()
+
+        # The frontend stamps commands with the Firebase server time (ms)
+        created_at = request.timestamp / 1000 if request.timestamp else received_at
+
+        print(f" * Executing command: {Fore.LIGHTYELLOW_EX}{request.type}{Style.RESET_ALL}")
+        self.on_command(request)
+
+        # The handlers return once the gate was pulsed, notifications are sent from their own thread
+        finished_at = time.time()
+        latency = finished_at - created_at
+        self.latencies.append(latency)
+        print(
+            f" * {request.type} latency: {latency * 1000:.0f}ms "
+            f"(firebase -> listener {(received_at - created_at) * 1000:.0f}ms, "
+            f"queued {(started_at - received_at) * 1000:.0f}ms, "
+            f"gpio {(finished_at - started_at) * 1000:.0f}ms)"
+        )
@@ -1,6 +1,9 @@
 from discord_webhook import DiscordWebhook, DiscordEmbed
 
 from Models.User import User
+from Services.WebhookClient import webhook_client
+
+from concurrent.futures import ThreadPoolExecutor
 
 import os
 
@@ -8,9 +11,17 @@ import os
 
 DISCORD_WEBHOOK: str = os.getenv('DISCORD_WEBHOOK')
 
+# One sender thread keeps messages in order and off the command scheduler's thread
+_sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="discord-sender")
+
 # ------------------------------------------------------------------ #
 
 def send_discord_message(user: User, title: str, content: str) -> None:
+    """Queues the message and returns, rate limits and timeouts never delay a gate command."""
+    _sender.submit(__send, user, title, content)
+
+
+def __send(user: User, title: str, content: str) -> None:
     webhook = DiscordWebhook(url=DISCORD_WEBHOOK, username='GateController')
     
     webhook.avatar_url = user.photo
@@ -19,6 +30,10 @@ def send_discord_message(user: User, title: str, content: str) -> None:
                          color='fff38e')
     webhook.add_embed(embed)
 
-    webhook.execute()
+    # Best effort, a failed message must never stop the gate command that sent it
+    try:
+        webhook_client.execute(webhook)
+    except Exception as e:
+        print(f"Failed sending Discord message: {e}")
 
 # ------------------------------------------------------------------ #
@@ -0,0 +1,90 @@
+from colorama import Fore, Style
+
+from Services.FirebaseClient import WriteBehindBuffer
+
+from threading import Thread
+
+import datetime
+import random
+import time
+import os
+
+# ------------------------------------------------------------------ #
+
+# The frontend shows "Offline" once program-status is older than 5 seconds
+HEARTBEAT_INTERVAL: float = float(os.getenv('HEARTBEAT_INTERVAL', '2'))
+HEARTBEAT_MAX_BACKOFF: float = float(os.getenv('HEARTBEAT_MAX_BACKOFF', '60'))
+HEARTBEAT_REPORT_INTERVAL: int = int(os.getenv('HEARTBEAT_REPORT_INTERVAL', '1800'))
+
+# ------------------------------------------------------------------ #
+
+class HeartbeatMetrics:
+    def __init__(self):
+        self.writes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def __str__(self):
+        average = self.total_latency / self.writes if self.writes else 0.0
+        return (
+            f"writes {self.writes} | failures {self.failures} | "
+            f"latency avg {average * 1000:.0f}ms max {self.max_latency * 1000:.0f}ms"
+        )
+
+# ------------------------------------------------------------------ #
+
+class Heartbeat:
+    """
+    Writes the liveness timestamp every `interval` seconds through the write
+    coalescing buffer (firebase_admin keeps the app's HTTP session alive between writes).
+    Errors back off exponentially with jitter instead of killing the process.
+    """
+
+    def __init__(self, client, path: str = "gate-controller/program-status", interval: float = HEARTBEAT_INTERVAL):
+        self._path = path
+        self._writer = WriteBehindBuffer(client)
+        self._interval = interval
+        self.metrics = HeartbeatMetrics()
+
+        self.thread = Thread(target=self.__heartbeat_thread, args=())
+        self.thread.daemon = True
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def beat(self) -> None:
+        start = time.monotonic()
+        self._writer.set(self._path, datetime.datetime.now().isoformat()).result()
+        latency = time.monotonic() - start
+
+        self.metrics.writes += 1
+        self.metrics.consecutive_failures = 0
+        self.metrics.total_latency += latency
+        self.metrics.max_latency = max(self.metrics.max_latency, latency)
+
+    def __backoff(self) -> float:
+        delay = min(self._interval * 2 ** self.metrics.consecutive_failures, HEARTBEAT_MAX_BACKOFF)
+        return delay * random.uniform(0.5, 1.0)
+
+    def __heartbeat_thread(self) -> None:
+        next_beat = time.monotonic()
+
+        while True:
+            try:
+                self.beat()
+                next_beat += self._interval
+
+                if HEARTBEAT_REPORT_INTERVAL and self.metrics.writes % HEARTBEAT_REPORT_INTERVAL == 0:
+                    print(f"Heartbeat: {self.metrics}")
+            except Exception as e:
+                self.metrics.failures += 1
+                self.metrics.consecutive_failures += 1
+                delay = self.__backoff()
+                next_beat = time.monotonic() + delay
+                print(f"{Fore.LIGHTRED_EX}Heartbeat failed ({self.metrics.consecutive_failures} in a row), retrying in {delay:.1f}s: {e}{Style.RESET_ALL}")
+
+            # Fixed rate - a slow write does not push the next one back
+            time.sleep(max(0.0, next_beat - time.monotonic()))
+            next_beat = max(next_beat, time.monotonic())
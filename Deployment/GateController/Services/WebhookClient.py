@@ -0,0 +1,105 @@
+from discord_webhook import DiscordWebhook
+from requests.adapters import HTTPAdapter
+
+import requests
+import threading
+import json
+import time
+import os
+
+# ------------------------------------------------------------------ #
+
+DISCORD_POOL_SIZE: int = int(os.getenv('DISCORD_POOL_SIZE', '4'))
+DISCORD_TIMEOUT: float = float(os.getenv('DISCORD_TIMEOUT', '10'))
+
+# ------------------------------------------------------------------ #
+
+class WebhookClient:
+    """
+    Sends DiscordWebhook messages over one keep-alive connection pool and waits
+    out Discord's rate limit bucket (X-RateLimit-* headers) before sending
+    instead of after getting a 429.
+    """
+
+    def __init__(self, pool_size: int = DISCORD_POOL_SIZE, timeout: float = DISCORD_TIMEOUT):
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._remaining = None
+        self._reset_at = 0.0
+
+    def _wait_for_bucket(self) -> None:
+        while True:
+            with self._lock:
+                if self._remaining is None or self._remaining > 0:
+                    if self._remaining is not None:
+                        # Reserve a slot for this request
+                        self._remaining -= 1
+                    return
+
+                delay = self._reset_at - time.monotonic()
+                if delay <= 0:
+                    # The bucket refilled, the next response tells us by how much
+                    self._remaining = None
+                    continue
+
+            # Every caller waits out the reset and checks again, the bucket stays exhausted until then
+            time.sleep(delay)
+
+    def _update_bucket(self, response: requests.Response) -> None:
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_after = response.headers.get('X-RateLimit-Reset-After')
+
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+            if reset_after is not None:
+                self._reset_at = time.monotonic() + float(reset_after)
+
+    def _post(self, webhook: DiscordWebhook) -> requests.Response:
+        if not webhook.files:
+            return self._session.post(webhook.url, json=webhook.json, params={"wait": True}, timeout=self._timeout)
+
+        files = dict(webhook.files)
+        files["payload_json"] = (None, json.dumps(webhook.json))
+        return self._session.post(webhook.url, files=files, params={"wait": True}, timeout=self._timeout)
+
+    def execute(self, webhook: DiscordWebhook, max_retries: int = 3) -> requests.Response:
+        for _ in range(max_retries + 1):
+            self._wait_for_bucket()
+
+            response = self._post(webhook)
+            self._update_bucket(response)
+
+            if response.status_code != 429:
+                break
+
+            # Shared/global limits are not always announced up front
+            retry_after = float(response.headers.get('Retry-After') or self._json(response).get('retry_after', 1))
+            with self._lock:
+                self._remaining = 0
+                self._reset_at = max(self._reset_at, time.monotonic() + retry_after)
+
+        if response.status_code not in [200, 204]:
+            raise requests.HTTPError(f"Webhook status code {response.status_code}: {response.text}", response=response)
+        return response
+
+    @staticmethod
+    def _json(response: requests.Response) -> dict:
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    def close(self) -> None:
+        self._session.close()
+
+# ------------------------------------------------------------------ #
+
+webhook_client = WebhookClient()
+
+# ------------------------------------------------------------------ #
@@ -2,29 +2,44 @@ from GateRadioController import operate_gate, cleanup
 
 from Services.DiscordSender import send_discord_message
 from Services.FirebaseListener import FirebaseListener
+from Services.CommandScheduler import CommandScheduler
 from Models.GateRequest import GateRequest
 from Models.User import User
 
 import threading
 import signal
-import time
 import sys
 
 # ------------------------------------------------------------------ #
 
 def __open_or_close(user: User, **_) -> None:
+    # The gate is open and waiting for its scheduled close, this toggle is that close
+    if scheduler.cancel('open&close'):
+        operate_gate()
+        send_discord_message(user, 'Close', 'Closing the gate, scheduled close cancelled')
+        return
+
+    operate_gate()
     send_discord_message(user, 'Open or Close', 'Openning or Closing the gate')
+
+
+def __close(user: User) -> None:
     operate_gate()
+    send_discord_message(user, 'Close', 'Closing the gate')
 
 
 def __open_and_close(user: User, delay_in_seconds: int = 90, **_) -> None:
-    send_discord_message(user, 'Open', 'Openning the gate')
-    operate_gate()
+    # operate_gate() toggles the gate, pulsing again while it is open would start closing it
+    if scheduler.pending('open&close'):
+        scheduler.schedule(delay_in_seconds, lambda: __close(user), key='open&close')
+        send_discord_message(user, 'Open', f'Gate already open, closing in {delay_in_seconds} seconds')
+        return
 
-    time.sleep(delay_in_seconds)
-    
-    send_discord_message(user, 'Close', 'Closing the gate')
     operate_gate()
+    send_discord_message(user, 'Open', 'Openning the gate')
+
+    # Timer on the scheduler instead of a sleeping thread
+    scheduler.schedule(delay_in_seconds, lambda: __close(user), key='open&close')
 
 
 requests = {
@@ -46,7 +61,8 @@ def signal_handler(signal, frame):
 
 # ------------------------------------------------------------------ #
 
-FirebaseListener(on_command)
+scheduler = CommandScheduler(on_command)
+FirebaseListener(scheduler.submit)
 
 signal.signal(signal.SIGINT, signal_handler)
 
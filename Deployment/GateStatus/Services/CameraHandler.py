@@ -1,35 +1,243 @@
+from Services.Capture import open_capture
 from colorama import Fore, Style
 
-import cv2  # Install opencv-python
+from collections import deque
+
+import threading
+import random
+import time
 import os 
 
 # --------------------------------------------------------------------------------------------------- #
 
 CAMERA_RTSP = os.getenv('RTSP_URL')
+CAMERA_STALL_TIMEOUT = float(os.getenv('CAMERA_STALL_TIMEOUT', '15'))          # seconds without a frame before reconnecting
+CAMERA_MAX_READ_ERRORS = int(os.getenv('CAMERA_MAX_READ_ERRORS', '5'))         # consecutive failed reads before reconnecting
+CAMERA_BACKOFF_INITIAL = float(os.getenv('CAMERA_BACKOFF_INITIAL', '1'))
+CAMERA_BACKOFF_MAX = float(os.getenv('CAMERA_BACKOFF_MAX', '60'))
+CAMERA_REPORT_INTERVAL = float(os.getenv('CAMERA_REPORT_INTERVAL', '300'))
+
+# --------------------------------------------------------------------------------------------------- #
+
+class CameraMetrics():
+    def __init__(self):
+        self.frames = 0
+        self.read_errors = 0
+        self.stalls = 0
+        self.reconnects = 0
+        self.failed_connects = 0
+        self.last_time_to_first_frame = None
+        self.total_time_to_first_frame = 0.0
+        self.first_frames = 0
+        self._reconnect_times = deque()
+
+    def record_reconnect(self):
+        self.reconnects += 1
+        self._reconnect_times.append(time.monotonic())
+
+    def record_first_frame(self, seconds):
+        self.last_time_to_first_frame = seconds
+        self.total_time_to_first_frame += seconds
+        self.first_frames += 1
+
+    def reconnects_per_hour(self):
+        """Reconnects during the last hour."""
+        hour_ago = time.monotonic() - 3600
+        while self._reconnect_times and self._reconnect_times[0] < hour_ago:
+            self._reconnect_times.popleft()
+        return len(self._reconnect_times)
+
+    def snapshot(self):
+        return {
+            'frames': self.frames,
+            'read_errors': self.read_errors,
+            'stalls': self.stalls,
+            'reconnects': self.reconnects,
+            'reconnects_per_hour': self.reconnects_per_hour(),
+            'failed_connects': self.failed_connects,
+            'time_to_first_frame': self.last_time_to_first_frame,
+            'avg_time_to_first_frame': self.total_time_to_first_frame / self.first_frames if self.first_frames else None,
+        }
+
+    def __str__(self):
+        average = self.total_time_to_first_frame / self.first_frames if self.first_frames else 0.0
+        return (
+            f"frames {self.frames} | read errors {self.read_errors} | stalls {self.stalls} | "
+            f"reconnects {self.reconnects} ({self.reconnects_per_hour()}/h) | failed connects {self.failed_connects} | "
+            f"time to first frame avg {average:.2f}s"
+        )
 
 # --------------------------------------------------------------------------------------------------- #
 
 class CameraHandler():
-    def __init__(self, verbose = False):
+    """
+    Owns the stream connection and only reconnects when it is unhealthy:
+
+      * Stall - no frame for `stall_timeout` seconds since the last frame (or the connect)
+      * Read errors - `max_read_errors` failed reads in a row
+      * Backoff - failed connections wait exponentially longer (with jitter) before the next attempt,
+        the delay resets once a frame arrives
+    """
+
+    def __init__(self, verbose = False, stall_timeout = CAMERA_STALL_TIMEOUT, max_read_errors = CAMERA_MAX_READ_ERRORS,
+                 backoff_initial = CAMERA_BACKOFF_INITIAL, backoff_max = CAMERA_BACKOFF_MAX, report_interval = CAMERA_REPORT_INTERVAL):
         print ("Init camera manager")
         self.video_capture = None
-        self.call_counter = 0
         self._verbose = verbose
 
+        self._stall_timeout = stall_timeout
+        self._max_read_errors = max_read_errors
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._report_interval = report_interval
+
+        self._backoff = backoff_initial
+        self._next_attempt = 0.0
+        self._connected_at = None
+        self._last_frame_time = None
+        self._consecutive_errors = 0
+        self._connections = 0
+        self._last_report = time.monotonic()
+
+        self.metrics = CameraMetrics()
+
     def camera(self, reset = False):
-        self.call_counter += 1
-        if self.call_counter == 100 or reset:
-            if self._verbose:
-                print("Refreshing camera connection")
-                print(" * Closing connection")
-            self.call_counter = 0
-            
-            self.video_capture.release()
-            self.video_capture = None
+        if reset:
+            self.disconnect("reset requested")
 
         if self.video_capture is None:
-            if self._verbose:
-                print(f" * {Fore.LIGHTGREEN_EX}Connecting to camera{Style.RESET_ALL}")
-            self.video_capture = cv2.VideoCapture(CAMERA_RTSP, apiPreference=cv2.CAP_FFMPEG)
+            self.__connect()
 
         return self.video_capture
+
+    def read(self):
+        """Returns the next frame, or None when the read failed (the connection is renewed if it looks dead)."""
+        capture = self.camera()
+        if not capture.isOpened():
+            self.metrics.failed_connects += 1
+            self.disconnect("connection failed")
+            return None
+
+        success, frame = capture.read()
+        now = time.monotonic()
+
+        if success and frame is not None:
+            if self._last_frame_time is None:
+                self.metrics.record_first_frame(now - self._connected_at)
+                self._backoff = self._backoff_initial
+            self._last_frame_time = now
+            self._consecutive_errors = 0
+            self.metrics.frames += 1
+            self.__report(now)
+            return frame
+
+        self.metrics.read_errors += 1
+        self._consecutive_errors += 1
+
+        if now - (self._last_frame_time or self._connected_at) > self._stall_timeout:
+            self.metrics.stalls += 1
+            self.disconnect(f"no frame for {self._stall_timeout:.0f}s")
+        elif self._consecutive_errors >= self._max_read_errors:
+            self.disconnect(f"{self._consecutive_errors} failed reads")
+        return None
+
+    def disconnect(self, reason):
+        if self.video_capture is None:
+            return
+
+        if self._verbose:
+            print(f" * Closing camera connection - {reason}")
+        self.video_capture.release()
+        self.video_capture = None
+
+        # Exponential backoff with jitter so a flapping camera is not hammered
+        delay = self._backoff / 2 + random.uniform(0, self._backoff / 2)
+        self._next_attempt = time.monotonic() + delay
+        self._backoff = min(self._backoff * 2, self._backoff_max)
+        print(f"{Fore.YELLOW}Camera connection lost ({reason}), reconnecting in {delay:.1f}s{Style.RESET_ALL}")
+
+    def __connect(self):
+        wait = self._next_attempt - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        if self._verbose:
+            print(f" * {Fore.LIGHTGREEN_EX}Connecting to camera{Style.RESET_ALL}")
+        if self._connections:
+            self.metrics.record_reconnect()
+        self._connections += 1
+
+        self._connected_at = time.monotonic()
+        self._last_frame_time = None
+        self._consecutive_errors = 0
+
+        # Full resolution, the crop offsets are in main stream pixels
+        self.video_capture = open_capture(CAMERA_RTSP)
+
+    def __report(self, now):
+        if now - self._last_report < self._report_interval:
+            return
+        self._last_report = now
+        print(f"Camera: {self.metrics}")
+
+    def release(self):
+        if self.video_capture is not None:
+            self.video_capture.release()
+            self.video_capture = None
+
+# --------------------------------------------------------------------------------------------------- #
+
+class FrameGrabber():
+    """Drains the camera stream on its own thread and keeps only the newest decoded frame."""
+
+    def __init__(self, camera_handler: CameraHandler, verbose = False):
+        self._camera_handler = camera_handler
+        self._verbose = verbose
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_id = 0
+
+        self._stop_flag = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        if self._verbose:
+            print(f" * {Fore.LIGHTGREEN_EX}Starting frame grabber thread{Style.RESET_ALL}")
+
+        self._thread = threading.Thread(target=self.__grab_thread, args=())
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_flag.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def __grab_thread(self):
+        while not self._stop_flag.is_set():
+            # Reconnecting (and backing off) is handled by the camera handler
+            frame = self._camera_handler.read()
+
+            # Skip empty frames
+            if frame is None:
+                continue
+
+            # Single slot buffer - older frames are simply overwritten
+            with self._lock:
+                self._frame = frame
+                self._frame_time = time.monotonic()
+                self._frame_id += 1
+
+    def latest(self):
+        """Returns (frame_id, frame, age_in_seconds) of the newest frame, frame is None until the first one arrives."""
+        with self._lock:
+            if self._frame is None:
+                return self._frame_id, None, None
+            return self._frame_id, self._frame, time.monotonic() - self._frame_time
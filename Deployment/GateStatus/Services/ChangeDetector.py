@@ -0,0 +1,74 @@
+import numpy as np
+import time
+import cv2
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+CHANGE_THRESHOLD = float(os.getenv('CHANGE_THRESHOLD', '20'))
+CHANGE_FORCE_INTERVAL = float(os.getenv('CHANGE_FORCE_INTERVAL', '60'))
+
+# --------------------------------------------------------------------------------------------------- #
+
+class ChangeDetector():
+    """
+    Skips inference while the gate ROI looks the same as the last classified frame.
+    Compares a small downsampled gray version of the ROI (MSE) and forces a
+    re-check every `force_interval` seconds regardless.
+    """
+
+    def __init__(self, crop, threshold = CHANGE_THRESHOLD, force_interval = CHANGE_FORCE_INTERVAL, size = (64, 64), report_interval = 1000, verbose = False):
+        self._crop = crop
+        self._threshold = threshold
+        self._force_interval = force_interval
+        self._size = size
+        self._report_interval = report_interval
+        self._verbose = verbose
+
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._current = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._reference = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._diff = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._has_reference = False
+        self._last_classified = 0.0
+
+        self.checked = 0
+        self.skipped = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def difference(self, frame) -> float:
+        cv2.resize(self._crop(frame), self._size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._current)
+
+        if not self._has_reference:
+            return float('inf')
+
+        cv2.absdiff(self._current, self._reference, dst=self._diff)
+        return float(np.mean(np.square(self._diff, dtype=np.float32)))
+
+    def should_classify(self, frame) -> bool:
+        self.checked += 1
+        now = time.monotonic()
+
+        difference = self.difference(frame)
+        changed = difference >= self._threshold
+        forced = now - self._last_classified >= self._force_interval
+
+        if changed or forced:
+            # Keep the frame we are about to classify as the new reference
+            self._current, self._reference = self._reference, self._current
+            self._has_reference = True
+            self._last_classified = now
+        else:
+            self.skipped += 1
+
+        if self._verbose and changed:
+            print(f"ROI changed (mse {difference:.1f})")
+
+        if self._report_interval and self.checked % self._report_interval == 0:
+            print(f"Change detector: skipped {self.skipped}/{self.checked} frames ({self.skip_ratio * 100:.1f}%)")
+
+        return changed or forced
@@ -1,39 +1,81 @@
 from discord_webhook import DiscordWebhook, DiscordEmbed
 
 from Models.Status import Status
+from Services.WebhookClient import webhook_client, LogBatcher
 
-from datetime import datetime
+import numpy as np
+import cv2
 import os
 
 # ------------------------------------------------------------------ #
 
 DISCORD_WEBHOOK: str = os.getenv('DISCORD_WEBHOOK')
 
+# full       - full resolution JPEG + raw float processed_input.npy (legacy)
+# compressed - full resolution JPEG at DISCORD_JPEG_QUALITY + uint8 processed_input.png
+# thumbnail  - JPEG resized to DISCORD_THUMBNAIL_WIDTH at DISCORD_JPEG_QUALITY
+# none       - embed only
+DISCORD_ATTACHMENT_PROFILE: str = os.getenv('DISCORD_ATTACHMENT_PROFILE', 'full').lower()
+DISCORD_JPEG_QUALITY: int = int(os.getenv('DISCORD_JPEG_QUALITY', '80'))
+DISCORD_THUMBNAIL_WIDTH: int = int(os.getenv('DISCORD_THUMBNAIL_WIDTH', '640'))
+
 # ------------------------------------------------------------------ #
 
+_log_batcher = LogBatcher(webhook_client, DISCORD_WEBHOOK, username='GateAI', title='Gate Status', color='22ad15')
+
 def send_log_message(msg: str) -> None:
-    webhook = DiscordWebhook(url=DISCORD_WEBHOOK, rate_limit_retry=True, username='GateAI')
+    # Batched into one embed per DISCORD_LOG_BATCH_INTERVAL
+    _log_batcher.add(msg)
 
-    embed = DiscordEmbed(title=f'Gate Status', color='22ad15')
-    embed.add_embed_field('Time', str(datetime.now()))
-    embed.add_embed_field('Log', msg, inline= False)
-    webhook.add_embed(embed)
+# ------------------------------------------------------------------ #
+
+def encode_attachments(frame, processed_input, profile: str = DISCORD_ATTACHMENT_PROFILE) -> dict:
+    """Encodes the status attachments for DISCORD_ATTACHMENT_PROFILE, returns {filename: bytes}."""
+    if profile == 'none':
+        return {}
 
-    webhook.execute()
+    if profile == 'full':
+        return {
+            'original.jpg': cv2.imencode('.jpg', frame)[1].tobytes(),
+            # The model runs on float32, the dump keeps the float64 layout it always had
+            'processed_input.npy': processed_input.astype(np.float64).tobytes()
+        }
+
+    jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, DISCORD_JPEG_QUALITY]
+
+    if profile == 'thumbnail':
+        (h, w) = frame.shape[:2]
+        if w > DISCORD_THUMBNAIL_WIDTH:
+            frame = cv2.resize(frame, (DISCORD_THUMBNAIL_WIDTH, h * DISCORD_THUMBNAIL_WIDTH // w), interpolation=cv2.INTER_AREA)
+        return { 'original.jpg': cv2.imencode('.jpg', frame, jpeg_params)[1].tobytes() }
+
+    if profile == 'compressed':
+        # [0, 1] floats back to the original 8 bit gray pixels - lossless for this input
+        model_input = np.rint(processed_input.reshape(processed_input.shape[1:3]) * 255).astype(np.uint8)
+        return {
+            'original.jpg': cv2.imencode('.jpg', frame, jpeg_params)[1].tobytes(),
+            'processed_input.png': cv2.imencode('.png', model_input, [cv2.IMWRITE_PNG_COMPRESSION, 9])[1].tobytes()
+        }
+
+    raise ValueError(f"Unknown DISCORD_ATTACHMENT_PROFILE '{profile}'")
 
 # ------------------------------------------------------------------ #
 
-def send_status_update(status: Status, original_image, processed_input) -> None:
-    webhook = DiscordWebhook(url=DISCORD_WEBHOOK, rate_limit_retry=True, username='GateAI')
-    webhook.add_file(file=original_image, filename='original.jpg')
-    webhook.add_file(file=processed_input.tobytes(), filename='processed_input.npy')
+def send_status_update(status: Status, frame, processed_input) -> None:
+    # Runs on the notification worker, so encoding never blocks capture/inference
+    attachments = encode_attachments(frame, processed_input)
+
+    webhook = DiscordWebhook(url=DISCORD_WEBHOOK, username='GateAI')
+    for filename, data in attachments.items():
+        webhook.add_file(file=data, filename=filename)
     
     embed = DiscordEmbed(title=f'Gate Status', color='fff38e')
     embed.add_embed_field('Status', status.current_status, inline= False)
     embed.add_embed_field('Confidence', f'{status.confidence_score}%', inline= False)
-    embed.set_thumbnail(url='attachment://original.jpg')
+    if 'original.jpg' in attachments:
+        embed.set_thumbnail(url='attachment://original.jpg')
     webhook.add_embed(embed)
 
-    webhook.execute()
+    webhook_client.execute(webhook)
 
 # ------------------------------------------------------------------ #
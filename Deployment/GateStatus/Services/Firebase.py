@@ -1,36 +1,23 @@
-from colorama import Fore, Style
-from firebase_admin import credentials
-from firebase_admin import db
+from Services.FirebaseClient import get_client, WriteBehindBuffer
 
 from Models.Status import Status
 
-import firebase_admin
 import dataclasses
-import os
 
 # ------------------------------------------------------------------ #
 
 
 class Firebase:
-    def __init__(self):
-        access_key_path = os.getenv('ACCESS_KEY_PATH')
-
-        json_path = os.path.join(access_key_path, "valla-projects-gate-controller.json")
-        project_id = "valla-projects"
-        options = {"databaseURL": "https://valla-projects-default-rtdb.firebaseio.com"}
-
-        print(f"Connecting to {Fore.LIGHTGREEN_EX}Firebase{Style.RESET_ALL}")
-
-        self.cred = credentials.Certificate(json_path)
-        self.app = firebase_admin.initialize_app(
-            credential=self.cred, options=options, name=project_id
-        )
-
-        print(f" * {Fore.LIGHTGREEN_EX}Connected{Style.RESET_ALL}")
+    def __init__(self, client = None):
+        self.client = client or get_client()
+        self.app = self.client.app
+        self._writer = WriteBehindBuffer(self.client)
         
     # ------------------------------------------------------------------ #
     
     def update_status(self, new_status: Status) -> None:
-        db.reference(f"gate-controller/status", app=self.app).set(dataclasses.asdict(new_status))
+        # Called from a NotificationPipeline worker - the first status in a window is written straight
+        # away, and waiting on the result lets a failed write raise so the pipeline counts it
+        self._writer.set("gate-controller/status", dataclasses.asdict(new_status)).result()
 
-# ------------------------------------------------------------------ #
\ No newline at end of file
+# ------------------------------------------------------------------ #
@@ -0,0 +1,220 @@
+from colorama import Fore, Style
+
+from concurrent.futures import Future
+
+import threading
+import copy
+import time
+import os
+
+# ------------------------------------------------------------------ #
+
+# firebase - the real realtime database, fake - in memory (offline tests/benchmarks)
+FIREBASE_BACKEND: str = os.getenv('FIREBASE_BACKEND', 'firebase').lower()
+FIREBASE_PROJECT_ID: str = os.getenv('FIREBASE_PROJECT_ID', 'valla-projects')
+FIREBASE_DATABASE_URL: str = os.getenv('FIREBASE_DATABASE_URL', 'https://valla-projects-default-rtdb.firebaseio.com')
+FIREBASE_CREDENTIALS_FILE: str = os.getenv('FIREBASE_CREDENTIALS_FILE', 'valla-projects-gate-controller.json')
+
+# Writes to the same path inside this window are coalesced into the newest one
+FIREBASE_WRITE_WINDOW: float = float(os.getenv('FIREBASE_WRITE_WINDOW', '0.5'))
+
+# ------------------------------------------------------------------ #
+
+class FirebaseClient:
+    """One initialized firebase app per process with cached database references."""
+
+    def __init__(self):
+        from firebase_admin import credentials
+        import firebase_admin
+
+        print(f"Connecting to {Fore.LIGHTGREEN_EX}Firebase{Style.RESET_ALL}")
+
+        try:
+            self.app = firebase_admin.get_app(FIREBASE_PROJECT_ID)
+        except ValueError:
+            json_path = os.path.join(os.getenv('ACCESS_KEY_PATH'), FIREBASE_CREDENTIALS_FILE)
+            self.app = firebase_admin.initialize_app(
+                credential=credentials.Certificate(json_path),
+                options={"databaseURL": FIREBASE_DATABASE_URL},
+                name=FIREBASE_PROJECT_ID
+            )
+
+        self._references = {}
+        self._lock = threading.Lock()
+
+        print(f" * {Fore.LIGHTGREEN_EX}Connected{Style.RESET_ALL}")
+
+    def reference(self, path: str):
+        from firebase_admin import db
+
+        with self._lock:
+            if path not in self._references:
+                self._references[path] = db.reference(path, app=self.app)
+            return self._references[path]
+
+# ------------------------------------------------------------------ #
+
+class FakeEvent:
+    def __init__(self, event_type: str, path: str, data):
+        self.event_type = event_type
+        self.path = path
+        self.data = data
+
+
+class FakeReference:
+    """The subset of firebase_admin.db.Reference the services use, backed by a dict tree."""
+
+    def __init__(self, client, path: str):
+        self._client = client
+        self.path = "/" + path.strip("/")
+        self._parts = [part for part in path.split("/") if part]
+
+    @property
+    def key(self):
+        return self._parts[-1] if self._parts else None
+
+    def child(self, path: str):
+        return FakeReference(self._client, "/".join(self._parts + [path.strip("/")]))
+
+    def get(self, shallow: bool = False):
+        with self._client.lock:
+            node = self._client.root
+            for part in self._parts:
+                if not isinstance(node, dict) or part not in node:
+                    return None
+                node = node[part]
+
+            if shallow and isinstance(node, dict):
+                return { key: True for key in node }
+            return copy.deepcopy(node)
+
+    def set(self, value) -> None:
+        self._client.write(self._parts, copy.deepcopy(value))
+
+    def update(self, value: dict) -> None:
+        for key, child_value in value.items():
+            self.child(key).set(child_value)
+
+    def delete(self) -> None:
+        self._client.write(self._parts, None)
+
+    def listen(self, callback):
+        self._client.listeners.append((self._parts, callback))
+        callback(FakeEvent('put', '/', self.get()))
+
+
+class FakeFirebaseClient:
+    """In memory stand in for FirebaseClient, counts writes per path."""
+
+    def __init__(self, initial: dict = None):
+        self.app = None
+        self.root = copy.deepcopy(initial) if initial else {}
+        self.lock = threading.RLock()
+        self.listeners = []
+        self.writes = {}
+
+    def reference(self, path: str):
+        return FakeReference(self, path)
+
+    def write(self, parts, value) -> None:
+        with self.lock:
+            path = "/".join(parts)
+            self.writes[path] = self.writes.get(path, 0) + 1
+
+            if not parts:
+                self.root = value or {}
+            else:
+                node = self.root
+                for part in parts[:-1]:
+                    node = node.setdefault(part, {})
+                if value is None:
+                    node.pop(parts[-1], None)
+                else:
+                    node[parts[-1]] = value
+
+            listeners = list(self.listeners)
+
+        for listener_parts, callback in listeners:
+            if parts[:len(listener_parts)] == listener_parts:
+                callback(FakeEvent('put', "/" + "/".join(parts[len(listener_parts):]), copy.deepcopy(value)))
+
+# ------------------------------------------------------------------ #
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The process wide client for FIREBASE_BACKEND."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = FakeFirebaseClient() if FIREBASE_BACKEND == 'fake' else FirebaseClient()
+        return _client
+
+# ------------------------------------------------------------------ #
+
+class WriteBehindBuffer:
+    """
+    Coalesces writes per path. A write to a path that was not written during
+    the last `window` seconds goes out straight away, later writes inside the
+    window are merged into the newest value and sent once the window ends.
+
+    set() returns a Future that resolves once the value (or a newer one that
+    replaced it) is written, or raises the write's error, so failures reach
+    the caller instead of being swallowed here.
+    """
+
+    def __init__(self, client, window: float = FIREBASE_WRITE_WINDOW):
+        self._client = client
+        self._window = window
+        self._pending = {}
+        self._last_write = {}
+        self._condition = threading.Condition()
+
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+
+        thread = threading.Thread(target=self.__flush_thread, args=())
+        thread.daemon = True
+        thread.start()
+
+    def set(self, path: str, value) -> Future:
+        with self._condition:
+            if path in self._pending:
+                self.coalesced += 1
+                _, future = self._pending[path]
+            else:
+                future = Future()
+
+            self._pending[path] = (value, future)
+            self._condition.notify()
+            return future
+
+    def __next_batch(self):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                due = [path for path in self._pending if now - self._last_write.get(path, -self._window) >= self._window]
+                if due:
+                    for path in due:
+                        self._last_write[path] = now
+                    return { path: self._pending.pop(path) for path in due }
+
+                # Wait for a new path or for the earliest window to end
+                timeout = min(self._last_write[path] + self._window for path in self._pending) - now if self._pending else None
+                self._condition.wait(timeout)
+
+    def __flush_thread(self) -> None:
+        while True:
+            for path, (value, future) in self.__next_batch().items():
+                try:
+                    self._client.reference(path).set(value)
+                    self.writes += 1
+                    future.set_result(None)
+                except Exception as e:
+                    self.failures += 1
+                    future.set_exception(e)
+
+# ------------------------------------------------------------------ #
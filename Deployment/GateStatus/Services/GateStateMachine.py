@@ -0,0 +1,127 @@
+import numpy as np
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+STATE_SMOOTHING = float(os.getenv('STATE_SMOOTHING', '0.5'))
+STATE_ENTER_THRESHOLD = float(os.getenv('STATE_ENTER_THRESHOLD', '0.75'))
+STATE_CONFIRM_FRAMES = int(os.getenv('STATE_CONFIRM_FRAMES', '2'))
+
+MOVING = 'Opening|Closing'
+
+# Current state -> predicted class -> next state, anything missing is an illegal transition
+transitions = {
+    '':        {'Closed': 'Closed', 'Open': 'Open', MOVING: MOVING},
+    MOVING:    {'Closed': 'Closed', 'Open': 'Open'},
+    'Closed':  {'Open': 'Open', MOVING: 'Opening'},
+    'Opening': {'Open': 'Open', 'Closed': 'Closed'},
+    'Open':    {'Closed': 'Closed', MOVING: 'Closing'},
+    'Closing': {'Closed': 'Closed', 'Open': 'Open'}
+}
+
+# The class the model predicts while the gate is in a given state
+observed_class = {
+    '': None,
+    MOVING: MOVING,
+    'Closed': 'Closed',
+    'Opening': MOVING,
+    'Open': 'Open',
+    'Closing': MOVING
+}
+
+# --------------------------------------------------------------------------------------------------- #
+
+class GateStateMachine():
+    """
+    Smooths per-class probabilities with an exponential moving average and only
+    changes state when:
+      * the smoothed probability of the new class is above `enter_threshold`
+      * it stayed the winner for `confirm_frames` consecutive predictions (hysteresis)
+      * the transition is legal (Closed -> Opening -> Open -> Closing -> Closed ...)
+    """
+
+    def __init__(self, class_names, smoothing = STATE_SMOOTHING, enter_threshold = STATE_ENTER_THRESHOLD, confirm_frames = STATE_CONFIRM_FRAMES):
+        self._class_names = list(class_names)
+        self._smoothing = smoothing
+        self._enter_threshold = enter_threshold
+        self._confirm_frames = confirm_frames
+
+        self._average = None
+        self._candidate = None
+        self._candidate_frames = 0
+        self._settled = False
+        self.state = ''
+
+    @property
+    def settled(self) -> bool:
+        """
+        True once the gate rests in Open/Closed and the smoothed prediction's winner
+        agrees (at any confidence), while a candidate or a transition is pending
+        every prediction counts.
+        """
+        return self._settled
+
+    def update(self, probabilities):
+        """Feeds one prediction, returns (new_state, confidence) on a state change otherwise None."""
+        probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+
+        if self._average is None:
+            self._average = probabilities.copy()
+        else:
+            self._average += self._smoothing * (probabilities - self._average)
+
+        index = int(np.argmax(self._average))
+        class_name = self._class_names[index]
+        confidence = float(self._average[index])
+
+        # No confidence requirement - a consistently unconfident model (night, glare) still settles on a static scene
+        self._settled = self.state in ('Open', 'Closed') and class_name == self.state
+
+        if confidence < self._enter_threshold or class_name == observed_class[self.state]:
+            self._candidate = None
+            self._candidate_frames = 0
+            return None
+
+        # Hysteresis - the new class has to win several predictions in a row
+        if class_name != self._candidate:
+            self._candidate = class_name
+            self._candidate_frames = 0
+        self._candidate_frames += 1
+        if self._candidate_frames < self._confirm_frames:
+            return None
+
+        next_state = transitions[self.state].get(class_name)
+        if next_state is None:
+            return None
+
+        self.state = next_state
+        self._candidate = None
+        self._candidate_frames = 0
+        return next_state, confidence
+
+# --------------------------------------------------------------------------------------------------- #
+
+def replay(class_names, predictions, **kwargs):
+    """
+    Replays a recorded stream of (timestamp, probabilities) and returns the events
+    the state machine emits next to how many the single frame logic would have sent.
+    """
+    state_machine = GateStateMachine(class_names, **kwargs)
+    events = []
+    naive_events = 0
+    last_class = ''
+
+    for timestamp, probabilities in predictions:
+        probabilities = np.asarray(probabilities).reshape(-1)
+
+        # The original main.py logic - any single prediction above 75% that differs
+        index = int(np.argmax(probabilities))
+        if probabilities[index] >= .75 and class_names[index] != last_class:
+            last_class = class_names[index]
+            naive_events += 1
+
+        change = state_machine.update(probabilities)
+        if change is not None:
+            events.append((timestamp, *change))
+
+    return events, naive_events
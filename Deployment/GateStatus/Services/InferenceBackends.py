@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+import numpy as np
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+
+# --------------------------------------------------------------------------------------------------- #
+
+class InferenceBackend(ABC):
+    """Runs the gate classifier on a (1, 224, 224, 1) input and returns the class probabilities."""
+
+    @abstractmethod
+    def predict(self, input_data) -> np.ndarray:
+        ...
+
+    def close(self) -> None:
+        pass
+
+# --------------------------------------------------------------------------------------------------- #
+
+class KerasBackend(InferenceBackend):
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        import tensorflow as tf
+
+        self._model = load_model(model_path, compile=False)
+
+        # Trace once with a fixed signature so every call reuses the same graph
+        # instead of growing the eager/retracing caches
+        self._predict = tf.function(
+            lambda input_data: self._model(input_data, training=False),
+            input_signature=[tf.TensorSpec((1, 224, 224, 1), tf.float32)]
+        )
+
+    def predict(self, input_data) -> np.ndarray:
+        return self._predict(np.asarray(input_data, dtype=np.float32)).numpy()
+
+    def close(self) -> None:
+        from tensorflow.keras import backend as K
+
+        del self._model
+        K.clear_session()
+
+# --------------------------------------------------------------------------------------------------- #
+
+class TFLiteBackend(InferenceBackend):
+    def __init__(self, model_path):
+        # Prefer the standalone runtime, it does not pull in the whole of tensorflow
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self._interpreter = Interpreter(model_path=model_path)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+
+    def predict(self, input_data) -> np.ndarray:
+        self._interpreter.set_tensor(self._input['index'], np.asarray(input_data, dtype=self._input['dtype']))
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output['index'])
+
+    def close(self) -> None:
+        del self._interpreter
+
+# --------------------------------------------------------------------------------------------------- #
+
+class OnnxBackend(InferenceBackend):
+    def __init__(self, model_path):
+        import onnxruntime as ort
+
+        self._session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, input_data) -> np.ndarray:
+        return self._session.run(None, {self._input_name: np.asarray(input_data, dtype=np.float32)})[0]
+
+    def close(self) -> None:
+        del self._session
+
+# --------------------------------------------------------------------------------------------------- #
+
+backends = {
+    'keras': (KerasBackend, ''),
+    'tflite': (TFLiteBackend, '.tflite'),
+    'onnx': (OnnxBackend, '.onnx')
+}
+
+def load_backend(model_path, backend = INFERENCE_BACKEND) -> InferenceBackend:
+    """
+    Keras loads the SavedModel directory itself, the other backends load the
+    exported file next to it (garage_gate_model.tflite / garage_gate_model.onnx).
+    """
+    if backend not in backends:
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{backend}', expected one of {list(backends.keys())}")
+
+    backend_class, extension = backends[backend]
+    return backend_class(f"{model_path}{extension}")
@@ -1,9 +1,8 @@
-from tensorflow.keras.models import load_model
-from tensorflow.keras import backend as K
+from Services.InferenceBackends import load_backend, INFERENCE_BACKEND
+from Services.MemoryTracker import MemoryTracker
+from Services.Preprocessing import FramePreprocessor
 
 import numpy as np
-import cv2
-import gc
 
 # --------------------------------------------------------------------------------------------------- #
 
@@ -13,10 +12,12 @@ np.set_printoptions(suppress=True)
 # --------------------------------------------------------------------------------------------------- #
 
 class MLHandler():
-    def __init__(self, max_usage_per_load = 1000, verbose = False):
+    def __init__(self, backend = INFERENCE_BACKEND, verbose = False):
         self._model_path = "garage_gate_model"
-        self._max_usage_per_load = max_usage_per_load
+        self._backend_name = backend
         self._verbose = verbose
+        self._memory_tracker = MemoryTracker()
+        self._preprocessor = FramePreprocessor()
         
         self.__load()
        
@@ -24,50 +25,32 @@ class MLHandler():
         from os import path
 
         if self._verbose:
-            print ("Loading")
+            print (f"Loading ({self._backend_name})")
 
-        self._model_usage_counter = 0 # Reset usage counter
-        self._model = load_model(self._model_path, compile=False) # Load the model
+        self._model = load_backend(self._model_path, self._backend_name) # Load the model
         self._class_names = np.load(path.join(self._model_path, "classes.npy")).tolist() # Load the labels
 
-    def __unload(self):
-        if self._verbose:
-            print("Unloading")
+    def crop(self, image):
+        return self._preprocessor.crop(image)
 
-        del self._model
-        gc.collect()
-        K.clear_session()
-    
     def preprocess_image(self, image):
-        # Crop image
-        (h, w) = image.shape[:2]
-        image = image[:h - 225, 200:w - 150] 
+        # The returned buffers are reused on the next call
+        return self._preprocessor(image)
 
-        # Resize image to 224x224
-        image = resized_image = cv2.resize(image, (224, 224))
+    @property
+    def class_names(self):
+        return self._class_names
 
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # Convert BGR to RGB
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)  # Convert the image to grayscale
-        image = np.expand_dims(image, axis=-1)  # Add channel dimension
-        image = (image / 255.0)  # Rescale the image array to [0, 1]
-    
-        # Makes the image not showable
-        image = image.reshape(1, 224, 224, 1)
-    
-        return image, resized_image
+    def predict_probabilities(self, input_data):
+        prediction = self._model.predict(input_data)
+        self._memory_tracker.tick()
+        return prediction[0]
 
     def predict(self, input_data):
-        self._model_usage_counter += 1
-        
-        # Reload the model
-        if self._model_usage_counter == self._max_usage_per_load:
-            self.__unload()
-            self.__load()
-
-        prediction = self._model(input_data)
+        prediction = self.predict_probabilities(input_data)
         index = np.argmax(prediction)
         class_name = self._class_names[index]
-        confidence_score = prediction[0][index]
+        confidence_score = prediction[index]
 
         return (class_name, np.round(confidence_score * 100))
    
\ No newline at end of file
@@ -0,0 +1,79 @@
+from colorama import Fore, Style
+
+import threading
+import resource
+import gc
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+MEMORY_REPORT_INTERVAL = int(os.getenv('MEMORY_REPORT_INTERVAL', '1000'))
+
+# --------------------------------------------------------------------------------------------------- #
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Not linux - fall back to the peak RSS (KB on linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def live_tensor_count() -> int:
+    return sum(1 for obj in gc.get_objects() if type(obj).__name__.endswith("Tensor"))
+
+# --------------------------------------------------------------------------------------------------- #
+
+class MemoryTracker():
+    """
+    Logs RSS and live tensor growth every `report_interval` predictions.
+    tick() only counts, the report (and its gc.get_objects() walk over the
+    whole heap) runs on its own thread instead of stalling inference.
+    """
+
+    def __init__(self, report_interval = MEMORY_REPORT_INTERVAL):
+        self._report_interval = report_interval
+        self._counter = 0
+        self._baseline_rss = None
+        self._last_rss = None
+        self._last_tensors = None
+
+        self._due = threading.Event()
+        if self._report_interval > 0:
+            thread = threading.Thread(target=self.__report_thread, args=(), name="memory-tracker")
+            thread.daemon = True
+            thread.start()
+
+    def tick(self) -> None:
+        self._counter += 1
+        if self._report_interval > 0 and self._counter % self._report_interval == 0:
+            self._due.set()
+
+    def __report_thread(self) -> None:
+        while True:
+            self._due.wait()
+            self._due.clear()
+            self.report(self._counter)
+
+    def report(self, predictions: int) -> None:
+        rss = current_rss_mb()
+        tensors = live_tensor_count()
+
+        if self._baseline_rss is None:
+            self._baseline_rss = rss
+            self._last_rss = rss
+            self._last_tensors = tensors
+
+        rss_delta = rss - self._last_rss
+        color = Fore.LIGHTRED_EX if rss_delta > 1 else Fore.LIGHTGREEN_EX
+
+        print(
+            f"Memory after {predictions} predictions: "
+            f"{color}RSS {rss:.1f}MB ({rss_delta:+.1f}MB, {rss - self._baseline_rss:+.1f}MB total){Style.RESET_ALL} | "
+            f"Tensors {tensors} ({tensors - self._last_tensors:+d})"
+        )
+
+        self._last_rss = rss
+        self._last_tensors = tensors
@@ -0,0 +1,140 @@
+from colorama import Fore, Style
+from collections import OrderedDict
+
+import threading
+import time
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', '2'))
+NOTIFICATION_MAX_PENDING = int(os.getenv('NOTIFICATION_MAX_PENDING', '10'))
+
+# --------------------------------------------------------------------------------------------------- #
+
+class SinkMetrics():
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def __str__(self):
+        average = self.total_latency / self.sent if self.sent else 0.0
+        return (
+            f"sent {self.sent} | failed {self.failed} | coalesced {self.coalesced} | dropped {self.dropped} | "
+            f"latency avg {average * 1000:.0f}ms max {self.max_latency * 1000:.0f}ms"
+        )
+
+# --------------------------------------------------------------------------------------------------- #
+
+class NotificationPipeline():
+    """
+    Bounded outbound queue served by a small worker pool so network I/O never
+    blocks the capture/inference loop.
+
+      * Coalescing - a newer event with the same key replaces the pending one per sink
+      * Backpressure - when `max_pending` events are queued the oldest one is dropped
+      * Ordering - events for the same (sink, key) are never delivered concurrently
+    """
+
+    def __init__(self, sinks, workers = NOTIFICATION_WORKERS, max_pending = NOTIFICATION_MAX_PENDING, verbose = False):
+        self._sinks = sinks
+        self._max_pending = max_pending
+        self._verbose = verbose
+
+        self._pending = OrderedDict()
+        self._in_flight = set()
+        self._condition = threading.Condition()
+        self._stop_flag = False
+
+        self.metrics = { name: SinkMetrics() for name in sinks }
+
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self.__worker_thread, args=(), name=f"notification-worker-{i + 1}")
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def publish(self, key, **payload) -> None:
+        """Queues `payload` for every sink, never blocks on the network."""
+        enqueue_time = time.monotonic()
+
+        with self._condition:
+            for sink in self._sinks:
+                pending_key = (sink, key)
+
+                if pending_key in self._pending:
+                    self.metrics[sink].coalesced += 1
+                    del self._pending[pending_key]
+                elif len(self._pending) >= self._max_pending:
+                    (dropped_sink, _), _ = self._pending.popitem(last=False)
+                    self.metrics[dropped_sink].dropped += 1
+
+                self._pending[pending_key] = (payload, enqueue_time)
+
+            self._condition.notify_all()
+
+    def __next_event(self):
+        # Oldest event whose (sink, key) is not already being delivered
+        for pending_key in self._pending:
+            if pending_key not in self._in_flight:
+                payload, enqueue_time = self._pending.pop(pending_key)
+                self._in_flight.add(pending_key)
+                return pending_key, payload, enqueue_time
+        return None
+
+    def __worker_thread(self) -> None:
+        while True:
+            with self._condition:
+                event = self.__next_event()
+                while event is None:
+                    if self._stop_flag:
+                        return
+                    self._condition.wait()
+                    event = self.__next_event()
+
+            (sink, key), payload, enqueue_time = event
+            success = False
+
+            try:
+                self._sinks[sink](**payload)
+                success = True
+            except Exception as e:
+                print(f"{Fore.LIGHTRED_EX}Failed sending {key} to {sink}: {e}{Style.RESET_ALL}")
+
+            latency = time.monotonic() - enqueue_time
+            if self._verbose and success:
+                print(f" * {sink}: {key} delivered in {latency * 1000:.0f}ms")
+
+            with self._condition:
+                metrics = self.metrics[sink]
+                if success:
+                    metrics.sent += 1
+                    metrics.total_latency += latency
+                    metrics.max_latency = max(metrics.max_latency, latency)
+                else:
+                    metrics.failed += 1
+
+                self._in_flight.discard((sink, key))
+                self._condition.notify_all()
+
+    def report(self) -> None:
+        with self._condition:
+            for sink, metrics in self.metrics.items():
+                print(f"{sink}: {metrics}")
+
+    def stop(self, timeout = 10.0) -> None:
+        """Delivers whatever is still pending and stops the workers."""
+        with self._condition:
+            deadline = time.monotonic() + timeout
+            while (self._pending or self._in_flight) and time.monotonic() < deadline:
+                self._condition.wait(timeout=deadline - time.monotonic())
+            self._stop_flag = True
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout=1.0)
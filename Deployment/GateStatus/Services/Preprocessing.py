@@ -0,0 +1,42 @@
+import numpy as np
+import cv2
+
+# --------------------------------------------------------------------------------------------------- #
+
+MODEL_INPUT_SIZE = (224, 224)
+
+# --------------------------------------------------------------------------------------------------- #
+
+class FramePreprocessor():
+    """
+    Crop -> resize -> gray -> [0, 1] float32 into preallocated buffers.
+
+    The returned arrays are owned by the preprocessor and are overwritten on the
+    next call, copy them if they need to outlive it.
+    """
+
+    def __init__(self, size = MODEL_INPUT_SIZE, crop_bottom = 225, crop_left = 200, crop_right = 150):
+        self._size = size
+        self._crop_bottom = crop_bottom
+        self._crop_left = crop_left
+        self._crop_right = crop_right
+
+        width, height = size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._output = np.empty((1, height, width, 1), dtype=np.float32)
+
+    def crop(self, frame):
+        # Slicing only creates a view, no pixels are copied
+        (h, w) = frame.shape[:2]
+        return frame[:h - self._crop_bottom, self._crop_left:w - self._crop_right]
+
+    def __call__(self, frame):
+        """Returns (model_input, resized_image) for a BGR frame."""
+        cv2.resize(self.crop(frame), self._size, dst=self._resized)
+
+        # BGR2GRAY gives the same result as BGR2RGB followed by RGB2GRAY
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        np.multiply(self._gray, np.float32(1 / 255.0), out=self._output[0, :, :, 0], casting='unsafe')
+
+        return self._output, self._resized
@@ -0,0 +1,162 @@
+from discord_webhook import DiscordWebhook, DiscordEmbed
+from requests.adapters import HTTPAdapter
+
+from datetime import datetime
+import requests
+import threading
+import atexit
+import json
+import time
+import os
+
+# ------------------------------------------------------------------ #
+
+DISCORD_POOL_SIZE: int = int(os.getenv('DISCORD_POOL_SIZE', '4'))
+DISCORD_TIMEOUT: float = float(os.getenv('DISCORD_TIMEOUT', '10'))
+DISCORD_LOG_BATCH_INTERVAL: float = float(os.getenv('DISCORD_LOG_BATCH_INTERVAL', '5'))
+
+# Discord allows at most 25 fields per embed
+MAX_EMBED_FIELDS: int = 25
+
+# ------------------------------------------------------------------ #
+
+class WebhookClient:
+    """
+    Sends DiscordWebhook messages over one keep-alive connection pool and waits
+    out Discord's rate limit bucket (X-RateLimit-* headers) before sending
+    instead of after getting a 429.
+    """
+
+    def __init__(self, pool_size: int = DISCORD_POOL_SIZE, timeout: float = DISCORD_TIMEOUT):
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._remaining = None
+        self._reset_at = 0.0
+
+    def _wait_for_bucket(self) -> None:
+        while True:
+            with self._lock:
+                if self._remaining is None or self._remaining > 0:
+                    if self._remaining is not None:
+                        # Reserve a slot for this request
+                        self._remaining -= 1
+                    return
+
+                delay = self._reset_at - time.monotonic()
+                if delay <= 0:
+                    # The bucket refilled, the next response tells us by how much
+                    self._remaining = None
+                    continue
+
+            # Every caller waits out the reset and checks again, the bucket stays exhausted until then
+            time.sleep(delay)
+
+    def _update_bucket(self, response: requests.Response) -> None:
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_after = response.headers.get('X-RateLimit-Reset-After')
+
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+            if reset_after is not None:
+                self._reset_at = time.monotonic() + float(reset_after)
+
+    def _post(self, webhook: DiscordWebhook) -> requests.Response:
+        if not webhook.files:
+            return self._session.post(webhook.url, json=webhook.json, params={"wait": True}, timeout=self._timeout)
+
+        files = dict(webhook.files)
+        files["payload_json"] = (None, json.dumps(webhook.json))
+        return self._session.post(webhook.url, files=files, params={"wait": True}, timeout=self._timeout)
+
+    def execute(self, webhook: DiscordWebhook, max_retries: int = 3) -> requests.Response:
+        for _ in range(max_retries + 1):
+            self._wait_for_bucket()
+
+            response = self._post(webhook)
+            self._update_bucket(response)
+
+            if response.status_code != 429:
+                break
+
+            # Shared/global limits are not always announced up front
+            retry_after = float(response.headers.get('Retry-After') or self._json(response).get('retry_after', 1))
+            with self._lock:
+                self._remaining = 0
+                self._reset_at = max(self._reset_at, time.monotonic() + retry_after)
+
+        if response.status_code not in [200, 204]:
+            raise requests.HTTPError(f"Webhook status code {response.status_code}: {response.text}", response=response)
+        return response
+
+    @staticmethod
+    def _json(response: requests.Response) -> dict:
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    def close(self) -> None:
+        self._session.close()
+
+# ------------------------------------------------------------------ #
+
+class LogBatcher:
+    """Collects log lines and sends them as one embed every `interval` seconds."""
+
+    def __init__(self, client: WebhookClient, url: str, username: str, title: str, color: str, interval: float = DISCORD_LOG_BATCH_INTERVAL):
+        self._client = client
+        self._url = url
+        self._username = username
+        self._title = title
+        self._color = color
+        self._interval = interval
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        thread = threading.Thread(target=self.__flush_thread, args=())
+        thread.daemon = True
+        thread.start()
+
+        # Do not lose the last batch on shutdown
+        atexit.register(self.flush)
+
+    def add(self, msg: str) -> None:
+        with self._lock:
+            self._pending.append((datetime.now(), msg))
+
+    def __flush_thread(self) -> None:
+        while True:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for start in range(0, len(pending), MAX_EMBED_FIELDS):
+            webhook = DiscordWebhook(url=self._url, username=self._username)
+
+            embed = DiscordEmbed(title=self._title, color=self._color)
+            for timestamp, msg in pending[start:start + MAX_EMBED_FIELDS]:
+                embed.add_embed_field(str(timestamp), msg, inline= False)
+            webhook.add_embed(embed)
+
+            try:
+                self._client.execute(webhook)
+            except Exception as e:
+                print(f"Failed sending log batch: {e}")
+
+# ------------------------------------------------------------------ #
+
+webhook_client = WebhookClient()
+
+# ------------------------------------------------------------------ #
@@ -0,0 +1,72 @@
+from Services.Capture import open_capture, decoder_options, capture_backends
+
+import argparse
+import time
+import cv2
+
+# --------------------------------------------------------------------------------------------------- #
+
+def scenarios(source, size, backends):
+    """(name, open function) pairs, the first one is the untuned cv2.VideoCapture baseline."""
+    yield "opencv defaults", lambda: cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+
+    tuned = decoder_options(source)
+    keyframes_only = dict(tuned, skip_frame='nokey')
+
+    for backend in backends:
+        yield f"{backend} tuned", lambda backend=backend: open_capture(source, backend=backend, options=tuned)
+        yield f"{backend} tuned + nokey", lambda backend=backend: open_capture(source, backend=backend, options=keyframes_only)
+        if size is not None:
+            yield f"{backend} tuned @ {size[0]}x{size[1]}", lambda backend=backend: open_capture(source, size=size, backend=backend, options=tuned)
+
+
+def measure(open_function, frames):
+    """Returns (frames read, decode ms/frame, process CPU%, first frame shape)."""
+    capture = open_function()
+    if not capture.isOpened():
+        return 0, None, None, None
+
+    count = 0
+    shape = None
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        while count < frames:
+            success, frame = capture.read()
+            if not success or frame is None:
+                break
+            shape = shape or frame.shape
+            count += 1
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        capture.release()
+
+    if count == 0:
+        return 0, None, None, None
+
+    # CPU% is relative to one core, multi-threaded decoding can go above 100
+    return count, wall / count * 1000, cpu / wall * 100, shape
+
+
+def main(source, frames, size, backends):
+    print(f"Decoding up to {frames} frames from {source}")
+    for name, open_function in scenarios(source, size, backends):
+        count, ms_per_frame, cpu_percent, shape = measure(open_function, frames)
+        if count == 0:
+            print(f" * {name}: no frames")
+            continue
+        print(f" * {name}: {count} frames {shape[1]}x{shape[0]} | {ms_per_frame:.2f}ms/frame | CPU {cpu_percent:.0f}%")
+
+# --------------------------------------------------------------------------------------------------- #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare camera decode settings on a recorded file or a local RTSP server")
+    parser.add_argument("source", help="Recorded video file or rtsp:// url (e.g. a local mediamtx re-streaming a recording)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", help="Also decode scaled to WIDTHxHEIGHT, e.g. 640x360")
+    parser.add_argument("--backends", default="opencv", help=f"Comma separated, any of {list(capture_backends)}")
+    args = parser.parse_args()
+
+    size = tuple(int(value) for value in args.size.split('x')) if args.size else None
+    main(args.source, args.frames, size, args.backends.split(','))
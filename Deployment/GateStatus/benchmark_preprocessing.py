@@ -0,0 +1,76 @@
+from Services.Preprocessing import FramePreprocessor
+
+import numpy as np
+import tracemalloc
+import argparse
+import glob
+import time
+import cv2
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+def legacy_preprocess_image(image):
+    """The original MLHandler/ModelPredictor chain, kept as the golden reference."""
+    (h, w) = image.shape[:2]
+    image = image[:h - 225, 200:w - 150]
+    image = resized_image = cv2.resize(image, (224, 224))
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    image = np.expand_dims(image, axis=-1)
+    image = (image / 255.0)
+    image = image.reshape(1, 224, 224, 1)
+    return image, resized_image
+
+# --------------------------------------------------------------------------------------------------- #
+
+def measure(preprocess, frames, iterations):
+    # Warm up so the preallocated buffers and opencv internals are in place
+    preprocess(frames[0])
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        preprocess(frames[i % len(frames)])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for i in range(iterations):
+        preprocess(frames[i % len(frames)])
+    _, peak = tracemalloc.get_traced_memory()
+    allocations = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('lineno'))
+    tracemalloc.stop()
+
+    return elapsed / iterations * 1e6, allocations / iterations, peak / 1024
+
+
+def main(frames_dir, iterations):
+    frame_paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg"))) if frames_dir else []
+    if frame_paths:
+        frames = [cv2.imread(frame_path) for frame_path in frame_paths]
+    else:
+        print("No recorded frames given, using random 1920x1080 frames")
+        frames = [np.random.randint(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(10)]
+
+    preprocess = FramePreprocessor()
+
+    # Golden output check
+    for frame in frames:
+        expected_input, expected_resized = legacy_preprocess_image(frame)
+        model_input, resized = preprocess(frame)
+        assert np.array_equal(resized, expected_resized), "Resized image differs from the legacy implementation"
+        assert np.allclose(model_input, expected_input, atol=1e-6), "Model input differs from the legacy implementation"
+    print(f"Golden output matches on {len(frames)} frames")
+
+    for name, function in [("legacy", legacy_preprocess_image), ("FramePreprocessor", preprocess)]:
+        us_per_frame, allocations_per_frame, peak_kb = measure(function, frames, iterations)
+        print(f" * {name}: {us_per_frame:.1f}us/frame | {allocations_per_frame:.1f} live allocations/frame | peak {peak_kb:.0f}KB")
+
+# --------------------------------------------------------------------------------------------------- #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the preprocessing kernel against the legacy implementation")
+    parser.add_argument("--frames-dir", help="Directory of recorded camera frames (*.jpg)")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    main(args.frames_dir, args.iterations)
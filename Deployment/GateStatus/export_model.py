@@ -0,0 +1,76 @@
+from Services.InferenceBackends import load_backend, backends
+from Services.Preprocessing import FramePreprocessor
+
+import numpy as np
+import argparse
+import glob
+import cv2
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+MODEL_PATH = "garage_gate_model"
+
+# --------------------------------------------------------------------------------------------------- #
+
+def export_tflite(model_path: str = MODEL_PATH) -> None:
+    import tensorflow as tf
+
+    print(f"Exporting {model_path}.tflite")
+    converter = tf.lite.TFLiteConverter.from_saved_model(model_path)
+    with open(f"{model_path}.tflite", "wb") as f:
+        f.write(converter.convert())
+
+
+def export_onnx(model_path: str = MODEL_PATH) -> None:
+    from tensorflow.keras.models import load_model
+    import tensorflow as tf
+    import tf2onnx
+
+    print(f"Exporting {model_path}.onnx")
+    model = load_model(model_path, compile=False)
+    input_signature = [tf.TensorSpec((None, 224, 224, 1), tf.float32, name="input")]
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, output_path=f"{model_path}.onnx")
+
+# --------------------------------------------------------------------------------------------------- #
+
+def verify_parity(frames_dir: str, model_path: str = MODEL_PATH) -> bool:
+    """Runs every backend on the recorded frames and checks they all agree on the predicted class."""
+    frame_paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")))
+    if not frame_paths:
+        print(f"No recorded frames found in {frames_dir}")
+        return False
+
+    preprocess = FramePreprocessor()
+    inputs = [preprocess(cv2.imread(frame_path))[0].copy() for frame_path in frame_paths]
+
+    results = {}
+    for name in backends:
+        backend = load_backend(model_path, name)
+        results[name] = [int(np.argmax(backend.predict(input_data))) for input_data in inputs]
+        backend.close()
+
+    reference = results['keras']
+    success = True
+    for name, predictions in results.items():
+        mismatches = [frame_paths[i] for i, prediction in enumerate(predictions) if prediction != reference[i]]
+        print(f" * {name}: {len(predictions) - len(mismatches)}/{len(predictions)} frames match keras")
+        for mismatch in mismatches:
+            print(f"   - {mismatch}")
+        success = success and not mismatches
+
+    return success
+
+# --------------------------------------------------------------------------------------------------- #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the gate SavedModel to TFLite/ONNX and verify backend parity")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--frames-dir", help="Directory of recorded camera frames (*.jpg) to verify parity on")
+    args = parser.parse_args()
+
+    export_tflite(args.model_path)
+    export_onnx(args.model_path)
+
+    if args.frames_dir and not verify_parity(args.frames_dir, args.model_path):
+        raise SystemExit(1)
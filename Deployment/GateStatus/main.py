@@ -1,14 +1,23 @@
 from Services.DiscordSender import send_log_message, send_status_update
-from Services.CameraHandler import CameraHandler
+from Services.CameraHandler import CameraHandler, FrameGrabber
+from Services.ChangeDetector import ChangeDetector
+from Services.GateStateMachine import GateStateMachine
 from Services.MLHandler import MLHandler
 from Services.Firebase import Firebase
+from Services.NotificationPipeline import NotificationPipeline
 
 from Models.Status import Status
 
 from datetime import datetime
 
+import json
 import time
 import cv2
+import os
+
+# --------------------------------------------------------------------------------------------------- #
+
+PREDICTIONS_LOG = os.getenv('PREDICTIONS_LOG')
 
 # --------------------------------------------------------------------------------------------------- #
 
@@ -17,21 +26,25 @@ def main():
 
     firebase = Firebase()
     camera_manager = CameraHandler()
+    frame_grabber = FrameGrabber(camera_manager).start()
     model = MLHandler()
+    change_detector = ChangeDetector(crop= model.crop)
+
+    state_machine = GateStateMachine(model.class_names)
+
+    # Firebase and Discord are sent from worker threads, the loop never waits on the network
+    notifications = NotificationPipeline({
+        'firebase': lambda status, **_: firebase.update_status(status),
+        'discord': lambda status, frame, processed_input: send_status_update(status, frame, processed_input)
+    })
+
+    # Record the raw predictions so the state machine can be replayed offline
+    prediction_log = open(PREDICTIONS_LOG, "a", buffering=1) if PREDICTIONS_LOG else None
 
-    last_status = ""
     last_time = time.time()
+    last_frame_id = 0
 
     while True:
-        success, frame = camera_manager.camera().read()
-        
-        if not success:
-            camera_manager.camera(reset= True)
-        
-        # Skip empty frames
-        if frame is None:
-            continue
-
         # Listen to the keyboard for presses.
         keyboard_input = cv2.waitKey(1)
 
@@ -39,41 +52,58 @@ def main():
         if keyboard_input == 27:
             break
 
+        # Sleep until the next inference tick instead of spinning
         curr_time = time.time()
-
-        processed_input, _ = model.preprocess_image(frame)
-        
         if curr_time - last_time < .5:
+            time.sleep(.5 - (curr_time - last_time))
+            continue
+
+        frame_id, frame, _ = frame_grabber.latest()
+
+        # Skip until a new frame arrives
+        if frame is None or frame_id == last_frame_id:
+            time.sleep(.01)
             continue
+        last_frame_id = frame_id
         last_time = curr_time
+
+        # Skip inference while the gate ROI has not changed, but only once the state machine settled -
+        # the predictions confirming a new state come after the gate (and the image) stopped moving
+        if state_machine.settled and not change_detector.should_classify(frame):
+            continue
+
+        processed_input, _ = model.preprocess_image(frame)
         
-        class_name, confidence_score = model.predict(processed_input)
+        probabilities = model.predict_probabilities(processed_input)
+
+        if prediction_log is not None:
+            prediction_log.write(json.dumps({"timestamp": curr_time, "probabilities": probabilities.tolist()}) + "\n")
 
-        # Skip predictions with lower than 75% confidence
-        if confidence_score < 75:
+        # Only emit once the smoothed prediction settles on a legal new state
+        change = state_machine.update(probabilities)
+        if change is None:
             continue
+        current_status, confidence = change
+        confidence_score = int(round(confidence * 100))
+
+        print(datetime.now())
+        print(f"Class: {current_status}")
+        print(f"Confidence Score: {confidence_score}%")
+        
+        new_status = Status(
+            current_status= current_status, 
+            confidence_score= confidence_score,
+            timestamp= time.time()
+        )
+        # Raw images only, the Discord worker encodes them - processed_input is the preprocessor's reused buffer
+        notifications.publish('status', status= new_status, frame= frame, processed_input= processed_input.copy())
+        notifications.report()
+
+    frame_grabber.stop()
+    notifications.stop()
+    if prediction_log is not None:
+        prediction_log.close()
 
-        # On prediction change send alert to discord
-        if last_status != class_name:
-            current_status = class_name
-            if class_name == 'Opening|Closing' and last_status == 'Open':
-                current_status = 'Closing'
-            elif class_name == 'Opening|Closing' and last_status == 'Closed':
-                current_status = 'Opening'
-            last_status = class_name
-
-            print(datetime.now())
-            print(f"Class: {current_status}")
-            print(f"Confidence Score: {str(confidence_score)[:-2]}%")
-            
-            new_status = Status(
-                current_status= current_status, 
-                confidence_score= int(str(confidence_score)[:-2]),
-                timestamp= time.time()
-            )
-            firebase.update_status(new_status)
-            send_status_update(new_status, cv2.imencode('.jpg', frame)[1], processed_input)
-            
 # --------------------------------------------------------------------------------------------------- #
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+from Services.GateStateMachine import replay
+from Services.FirebaseClient import FakeFirebaseClient
+from Services.Firebase import Firebase
+from Services.NotificationPipeline import NotificationPipeline
+
+from Models.Status import Status
+
+from datetime import datetime
+
+import numpy as np
+import argparse
+import json
+
+# --------------------------------------------------------------------------------------------------- #
+
+def load_predictions(path: str):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["timestamp"], record["probabilities"]
+
+def deliver(events) -> None:
+    """Publishes the events through NotificationPipeline to an in memory Firebase and reports the sink metrics."""
+    client = FakeFirebaseClient()
+    firebase = Firebase(client)
+    notifications = NotificationPipeline({ 'firebase': lambda status, **_: firebase.update_status(status) })
+
+    for timestamp, state, confidence in events:
+        notifications.publish('status', status= Status(current_status= state, confidence_score= int(round(confidence * 100)), timestamp= timestamp))
+
+    notifications.stop()
+    notifications.report()
+    print(f"Firebase writes: {client.writes.get('gate-controller/status', 0)} | final status: {client.reference('gate-controller/status').get()}")
+
+# --------------------------------------------------------------------------------------------------- #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a recorded PREDICTIONS_LOG through the gate state machine")
+    parser.add_argument("predictions_log")
+    parser.add_argument("--classes", default="garage_gate_model/classes.npy")
+    parser.add_argument("--smoothing", type=float)
+    parser.add_argument("--enter-threshold", type=float)
+    parser.add_argument("--confirm-frames", type=int)
+    parser.add_argument("--deliver", action="store_true", help="Also publish the events to an in memory Firebase")
+    args = parser.parse_args()
+
+    class_names = np.load(args.classes).tolist()
+    kwargs = {
+        name: value for name, value in [
+            ("smoothing", args.smoothing),
+            ("enter_threshold", args.enter_threshold),
+            ("confirm_frames", args.confirm_frames)
+        ] if value is not None
+    }
+
+    events, naive_events = replay(class_names, load_predictions(args.predictions_log), **kwargs)
+
+    for timestamp, state, confidence in events:
+        print(f"{datetime.fromtimestamp(timestamp)} {state} ({confidence * 100:.0f}%)")
+
+    # Every event costs one Firebase write and one Discord upload
+    print(f"Single frame logic: {naive_events} events | State machine: {len(events)} events")
+    print(f"Removed {naive_events - len(events)} spurious events ({(naive_events - len(events)) * 2} network calls)")
+
+    if args.deliver:
+        deliver(events)
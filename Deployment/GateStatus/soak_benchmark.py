@@ -0,0 +1,36 @@
+from Services.MLHandler import MLHandler
+from Services.MemoryTracker import current_rss_mb
+
+import argparse
+import time
+import cv2
+
+# --------------------------------------------------------------------------------------------------- #
+
+def soak(frame_path: str, hours: float) -> None:
+    model = MLHandler(verbose= True)
+    processed_input, _ = model.preprocess_image(cv2.imread(frame_path))
+
+    start_rss = current_rss_mb()
+    start_time = time.time()
+    end_time = start_time + hours * 60 * 60
+    predictions = 0
+
+    while time.time() < end_time:
+        model.predict(processed_input)
+        predictions += 1
+
+    elapsed = time.time() - start_time
+    end_rss = current_rss_mb()
+    print(f"{predictions} predictions in {elapsed:.0f}s ({elapsed / predictions * 1000:.2f}ms/prediction)")
+    print(f"RSS {start_rss:.1f}MB -> {end_rss:.1f}MB ({end_rss - start_rss:+.1f}MB)")
+
+# --------------------------------------------------------------------------------------------------- #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the classifier in a loop and report memory growth")
+    parser.add_argument("frame", help="Recorded camera frame (jpg) to classify")
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    soak(args.frame, args.hours)
@@ -0,0 +1,175 @@
+import threading
+import cv2
+import re
+import os
+import config
+
+# Options that belong to the demuxer, everything else is handed to the decoder
+FORMAT_OPTIONS = ('rtsp_transport', 'fflags')
+
+# Main stream -> substream rewrites for the common camera url layouts
+SUBSTREAM_PATTERNS = [
+    (r'(/Streaming/Channels/\d+)01\b', r'\g<1>02'),     # Hikvision
+    (r'/main/', '/sub/'),                               # Hikvision (legacy)
+    (r'subtype=0\b', 'subtype=1'),                      # Dahua / Amcrest
+    (r'_main\b', '_sub'),                               # Reolink
+]
+
+def substream_url(url, substream = config.capture_substream):
+    """Returns the url to open, the camera's lower resolution substream when requested."""
+    if substream.lower() in ('', 'false'):
+        return url
+
+    # An explicit url always wins over guessing
+    if substream.lower() != 'true':
+        return substream
+
+    for pattern, replacement in SUBSTREAM_PATTERNS:
+        rewritten = re.sub(pattern, replacement, url)
+        if rewritten != url:
+            return rewritten
+
+    print("Could not derive a substream url, using the main stream (set CAPTURE_SUBSTREAM to the url instead)")
+    return url
+
+
+def decoder_options(url, transport = config.capture_transport, threads = config.capture_threads, skip_frame = config.capture_skip_frame, low_delay = config.capture_low_delay):
+    """FFmpeg options (name -> value) for the given source."""
+    options = {}
+    if url.startswith(('rtsp://', 'rtsps://')) and transport:
+        options['rtsp_transport'] = transport
+    if threads:
+        options['threads'] = str(threads)
+    if skip_frame and skip_frame != 'default':
+        options['skip_frame'] = skip_frame
+    if low_delay:
+        options['fflags'] = 'nobuffer'
+        options['flags'] = 'low_delay'
+    return options
+
+
+def ffmpeg_capture_options(options):
+    """Encodes the options in the OPENCV_FFMPEG_CAPTURE_OPTIONS format ("name;value|name;value")."""
+    return '|'.join(f'{name};{value}' for name, value in options.items())
+
+
+class OpenCVCapture():
+    """
+    cv2.VideoCapture opened with the FFmpeg options from OPENCV_FFMPEG_CAPTURE_OPTIONS.
+
+    Demuxer options always apply, the decoder options (threads, skip_frame, flags)
+    only reach the decoder on OpenCV builds that forward them - use the pyav
+    backend when those matter. OpenCV cannot scale while decoding, so frames are
+    resized after the read when a size is given.
+    """
+
+    # OPENCV_FFMPEG_CAPTURE_OPTIONS is process wide and only read while opening
+    _environment_lock = threading.Lock()
+
+    def __init__(self, url, options, size = None, timeout = config.capture_timeout, hw_accel = config.capture_hw_accel):
+        self._size = size
+
+        # Bounded open/read so a dead stream surfaces as a failed read instead of hanging
+        params = []
+        if timeout and hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(timeout * 1000), cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(timeout * 1000)]
+        if 'threads' in options and hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            params += [cv2.CAP_PROP_N_THREADS, int(options['threads'])]
+        if hw_accel and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+        with OpenCVCapture._environment_lock:
+            # Options set explicitly in the environment are left untouched
+            user_options = os.environ.get('OPENCV_FFMPEG_CAPTURE_OPTIONS')
+            if user_options is None:
+                os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = ffmpeg_capture_options(options)
+            try:
+                self._capture = cv2.VideoCapture(url, cv2.CAP_FFMPEG, params)
+            finally:
+                if user_options is None:
+                    del os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS']
+
+    def isOpened(self):
+        return self._capture.isOpened()
+
+    def read(self):
+        success, frame = self._capture.read()
+        if frame is not None and self._size is not None and (frame.shape[1], frame.shape[0]) != self._size:
+            frame = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+        return success, frame
+
+    def release(self):
+        self._capture.release()
+
+
+class PyAVCapture():
+    """
+    Decodes through PyAV, which applies every decoder option directly and scales
+    inside the colour conversion (one swscale pass) instead of after it.
+    """
+
+    def __init__(self, url, options, size = None, timeout = config.capture_timeout):
+        import av
+
+        self._av = av
+        self._size = size
+
+        format_options = {name: value for name, value in options.items() if name in FORMAT_OPTIONS}
+        codec_options = {name: value for name, value in options.items() if name not in FORMAT_OPTIONS}
+
+        try:
+            self._container = av.open(url, options=format_options, timeout=timeout)
+        except av.error.FFmpegError as e:
+            print(f"Failed to open {url}: {e}")
+            self._container = None
+            return
+
+        self._stream = self._container.streams.video[0]
+        self._stream.thread_type = 'AUTO'
+        self._stream.codec_context.options = codec_options
+        self._frames = self._container.decode(self._stream)
+
+    def isOpened(self):
+        return self._container is not None
+
+    def read(self):
+        if self._container is None:
+            return False, None
+
+        try:
+            frame = next(self._frames)
+        except (StopIteration, self._av.error.FFmpegError):
+            return False, None
+
+        if self._size is None:
+            return True, frame.to_ndarray(format='bgr24')
+
+        width, height = self._size
+        return True, frame.reformat(width=width, height=height, format='bgr24', interpolation='AREA').to_ndarray()
+
+    def release(self):
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+
+
+capture_backends = {
+    'opencv': OpenCVCapture,
+    'pyav': PyAVCapture,
+}
+
+def open_capture(url, size = None, backend = config.capture_backend, options = None, timeout = config.capture_timeout):
+    """
+    Opens the (sub)stream with the configured backend (same module as GateStatus'
+    Services/Capture.py). Every backend exposes the isOpened / read / release
+    subset of cv2.VideoCapture, read() returns BGR frames at size (width, height)
+    when one is given.
+    """
+    if backend not in capture_backends:
+        raise ValueError(f"Unknown capture backend '{backend}', expected one of {list(capture_backends)}")
+
+    url = substream_url(url)
+    if options is None:
+        options = decoder_options(url)
+
+    return capture_backends[backend](url, options, size=size, timeout=timeout)
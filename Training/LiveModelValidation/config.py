@@ -9,9 +9,23 @@ model_path = os.getenv('MODEL_PATH', 'garage_gate_model')
 
 # Camera configuration
 camera_rtsp_url = os.getenv('CAMERA_RTSP_URL', 'RTSP_URL')
-camera_width = int(os.getenv('CAMERA_WIDTH', 640))
-camera_height = int(os.getenv('CAMERA_HEIGHT', 480))
-camera_refresh_interval = int(os.getenv('CAMERA_REFRESH_INTERVAL', 100))
+camera_stall_timeout = float(os.getenv('CAMERA_STALL_TIMEOUT', 15))  # seconds without a frame before reconnecting
+camera_max_read_errors = int(os.getenv('CAMERA_MAX_READ_ERRORS', 5))  # consecutive failed reads before reconnecting
+camera_backoff_initial = float(os.getenv('CAMERA_BACKOFF_INITIAL', 1))
+camera_backoff_max = float(os.getenv('CAMERA_BACKOFF_MAX', 60))
+camera_report_interval = float(os.getenv('CAMERA_REPORT_INTERVAL', 300))
+
+# Capture configuration
+capture_backend = os.getenv('CAPTURE_BACKEND', 'opencv').lower()  # opencv | pyav
+capture_substream = os.getenv('CAPTURE_SUBSTREAM', 'false')  # false | true | explicit substream url
+capture_transport = os.getenv('CAPTURE_TRANSPORT', 'tcp').lower()  # tcp | udp
+capture_threads = int(os.getenv('CAPTURE_THREADS', 2))  # decoder threads, 0 lets ffmpeg decide
+capture_skip_frame = os.getenv('CAPTURE_SKIP_FRAME', 'default')  # default | nonref | nokey
+capture_low_delay = os.getenv('CAPTURE_LOW_DELAY', 'true').lower() == 'true'
+capture_hw_accel = os.getenv('CAPTURE_HW_ACCEL', 'false').lower() == 'true'
+capture_timeout = float(os.getenv('CAPTURE_TIMEOUT', 10))  # seconds an open/read may block
+# WIDTHxHEIGHT to decode at, 360x640 matches the model input, unset keeps the full resolution
+capture_decode_size = tuple(int(v) for v in os.getenv('CAPTURE_DECODE_SIZE').split('x')) if os.getenv('CAPTURE_DECODE_SIZE') else None
 
 # Live testing configuration
 live_test_predictions_dir = os.getenv('LIVE_TEST_PREDICTIONS_DIR', 'LiveTest/Predictions')
@@ -4,39 +4,135 @@ import numpy as np
 import cv2
 import tensorflow as tf
 import config
+import random
 import time
+from collections import deque
+from capture import open_capture
+
+class CameraMetrics:
+    """Connection health counters for the camera stream."""
+
+    def __init__(self):
+        self.frames = 0
+        self.read_errors = 0
+        self.stalls = 0
+        self.reconnects = 0
+        self.failed_connects = 0
+        self.last_time_to_first_frame = None
+        self.total_time_to_first_frame = 0.0
+        self.first_frames = 0
+        self._reconnect_times = deque()
+
+    def record_reconnect(self):
+        self.reconnects += 1
+        self._reconnect_times.append(time.monotonic())
+
+    def record_first_frame(self, seconds):
+        self.last_time_to_first_frame = seconds
+        self.total_time_to_first_frame += seconds
+        self.first_frames += 1
+
+    def reconnects_per_hour(self):
+        hour_ago = time.monotonic() - 3600
+        while self._reconnect_times and self._reconnect_times[0] < hour_ago:
+            self._reconnect_times.popleft()
+        return len(self._reconnect_times)
+
+    def __str__(self):
+        average = self.total_time_to_first_frame / self.first_frames if self.first_frames else 0.0
+        return (f"frames {self.frames} | read errors {self.read_errors} | stalls {self.stalls} | "
+                f"reconnects {self.reconnects} ({self.reconnects_per_hour()}/h) | failed connects {self.failed_connects} | "
+                f"time to first frame avg {average:.2f}s")
 
 class CameraHandler:
-    """Handles camera connection and management."""
+    """Handles camera connection and management.
+
+    The connection is only renewed when it looks dead (no frame for
+    camera_stall_timeout seconds or camera_max_read_errors failed reads in a
+    row), reconnect attempts back off exponentially with jitter.
+    """
     
     def __init__(self, rtsp_url=None, verbose=None):
         self.rtsp_url = rtsp_url or config.camera_rtsp_url
         self.video_capture = None
-        self.call_counter = 0
         self._verbose = config.live_test_verbose if verbose is None else verbose
+        self._backoff = config.camera_backoff_initial
+        self._next_attempt = 0.0
+        self._connected_at = None
+        self._last_frame_time = None
+        self._consecutive_errors = 0
+        self._connections = 0
+        self._last_report = time.monotonic()
+        self.metrics = CameraMetrics()
         print("Camera handler initialized")
 
     def camera(self, reset=False):
-        self.call_counter += 1
-        if self.call_counter == config.camera_refresh_interval or reset:
-            if self._verbose:
-                print('Refreshing camera connection')
-                print(' * Closing connection')
-            self.call_counter = 0
-            if self.video_capture is not None:
-                self.video_capture.release()
-            self.video_capture = None
+        if reset:
+            self.disconnect('reset requested')
         if self.video_capture is None:
-            if self._verbose:
-                print(f' * Connecting to camera: {self.rtsp_url}')
-            self.video_capture = cv2.VideoCapture(self.rtsp_url, apiPreference=cv2.CAP_FFMPEG)
-            self.video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, config.camera_width)
-            self.video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, config.camera_height)
+            self._connect()
         return self.video_capture
 
+    def read(self):
+        """Return the next frame, or None when the read failed."""
+        capture = self.camera()
+        if not capture.isOpened():
+            self.metrics.failed_connects += 1
+            self.disconnect('connection failed')
+            return None
+        success, frame = capture.read()
+        now = time.monotonic()
+        if success and frame is not None:
+            if self._last_frame_time is None:
+                self.metrics.record_first_frame(now - self._connected_at)
+                self._backoff = config.camera_backoff_initial
+            self._last_frame_time = now
+            self._consecutive_errors = 0
+            self.metrics.frames += 1
+            if now - self._last_report >= config.camera_report_interval:
+                self._last_report = now
+                print(f'Camera: {self.metrics}')
+            return frame
+        self.metrics.read_errors += 1
+        self._consecutive_errors += 1
+        if now - (self._last_frame_time or self._connected_at) > config.camera_stall_timeout:
+            self.metrics.stalls += 1
+            self.disconnect(f'no frame for {config.camera_stall_timeout:.0f}s')
+        elif self._consecutive_errors >= config.camera_max_read_errors:
+            self.disconnect(f'{self._consecutive_errors} failed reads')
+        return None
+
+    def disconnect(self, reason):
+        if self.video_capture is None:
+            return
+        if self._verbose:
+            print(f' * Closing connection - {reason}')
+        self.video_capture.release()
+        self.video_capture = None
+        # Exponential backoff with jitter so a flapping camera is not hammered
+        delay = self._backoff / 2 + random.uniform(0, self._backoff / 2)
+        self._next_attempt = time.monotonic() + delay
+        self._backoff = min(self._backoff * 2, config.camera_backoff_max)
+        print(f'Camera connection lost ({reason}), reconnecting in {delay:.1f}s')
+
+    def _connect(self):
+        wait = self._next_attempt - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if self._verbose:
+            print(f' * Connecting to camera: {self.rtsp_url}')
+        if self._connections:
+            self.metrics.record_reconnect()
+        self._connections += 1
+        self._connected_at = time.monotonic()
+        self._last_frame_time = None
+        self._consecutive_errors = 0
+        self.video_capture = open_capture(self.rtsp_url, size=config.capture_decode_size)
+
     def release(self):
         if self.video_capture:
             self.video_capture.release()
+            self.video_capture = None
 
 class LiveTester:
     """Class for live testing of the garage gate model (TFLite)."""
@@ -63,6 +159,8 @@ class LiveTester:
         self.camera_handler = CameraHandler(self.rtsp_url)
         self.last_gate_label = ''
         self.last_parking_label = ''
+        self._resized = np.empty((640, 360, 3), dtype=np.uint8)
+        self._input = np.empty((1, 640, 360, 3), dtype=np.float32)
         os.makedirs(config.live_test_predictions_dir, exist_ok=True)
 
     def _find_latest_model_dir(self):
@@ -79,6 +177,12 @@ class LiveTester:
         return {str(k): int(v) for k, v in labels.items()}
 
     def preprocess_frame(self, frame):
+        # Colour frames go through preallocated buffers (resize + single float32 scale),
+        # the returned array is overwritten on the next call
+        if frame.ndim == 3 and frame.shape[-1] == 3:
+            cv2.resize(frame, (360, 640), dst=self._resized)
+            np.multiply(self._resized, np.float32(1 / 255.0), out=self._input[0], casting='unsafe')
+            return self._input
         img = cv2.resize(frame, (360, 640))
         if img.ndim == 2:
             img = np.expand_dims(img, axis=-1)
@@ -92,7 +196,7 @@ class LiveTester:
         print("Starting live testing with TFLite model...")
         print("Press 'q' to quit")
         while True:
-            ret, frame = self.camera_handler.camera().read()
+            frame = self.camera_handler.read()
             if frame is None:
                 print("No frame received from camera")
                 continue
@@ -138,6 +242,7 @@ class LiveTester:
                 break
         self.camera_handler.release()
         cv2.destroyAllWindows()
+        print(f"Camera: {self.camera_handler.metrics}")
         print("Live testing stopped")
 
 def main():